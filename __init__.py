@@ -1,11 +1,9 @@
 # <pep8-80 compliant>
 """
-Initialisation of the plugin
+Initialisation of the plugin, Blender modules are only imported on
+registration so that worker processes can import the file parsing without
+bpy
 """
-import bpy
-
-from .operator_export import operator_bwm_export
-from .operator_import import operator_bwm_import
 
 bl_info = {
     "name": "Black & White Model (.bwm) Format",
@@ -18,6 +16,11 @@ def register():
     """
     Register both import and export class into Blender
     """
+    import bpy
+
+    from .operator_export import operator_bwm_export
+    from .operator_import import operator_bwm_import
+
     print(f"Registering : {bl_info['name']}")
 
     operator_bwm_import.register()
@@ -32,6 +35,11 @@ def unregister():
     """
     Unregister both import and export class into Blender
     """
+    import bpy
+
+    from .operator_export import operator_bwm_export
+    from .operator_import import operator_bwm_import
+
     print(f"Unregistering : {bl_info['name']}")
 
     operator_bwm_import.unregister()
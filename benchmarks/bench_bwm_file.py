@@ -0,0 +1,163 @@
+# coding=utf-8
+"""
+Benchmark of BWMFile parsing, writing and round-trip throughput on
+synthetic files, the results are printed as JSON.
+
+Run from the root of the repository:
+    python -m benchmarks.bench_bwm_file --vertices 1000 65536 -o out.json
+"""
+
+from typing import Callable, Dict, List, Tuple
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from operator_utilities.bwm_generator import generate_bwm
+from operator_utilities.file_definition_bwm import BWMFile
+
+
+def parse(filepath: str) -> BWMFile:
+    with open(filepath, "rb") as reader:
+        return BWMFile(reader)
+
+
+def write(bwm: BWMFile, filepath: str) -> None:
+    if os.path.exists(filepath):
+        os.remove(filepath)
+    bwm.write(filepath)
+
+
+def round_trip(filepath: str, result_path: str) -> None:
+    write(parse(filepath), result_path)
+    with open(filepath, "rb") as original, open(result_path, "rb") as result:
+        if original.read() != result.read():
+            raise ValueError(f"Round-trip of {filepath} isn't an exact copy")
+
+
+def measure(function: Callable, repeat: int) -> Tuple[float, int]:
+    """Median wall time over repeat calls and peak traced memory of one"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings), peak
+
+
+def run_case(
+    directory: str, vertex_count: int, skin: bool, version: int, repeat: int
+) -> Dict:
+    layout = "skin" if skin else "model"
+    filepath = os.path.join(directory, f"{layout}_{version}_{vertex_count}.bwm")
+    result_path = filepath + ".out"
+    bwm = generate_bwm(
+        vertex_count,
+        mesh_count=4,
+        lod_count=4,
+        material_count=2,
+        skin=skin,
+        version=version,
+        cleave_count=4,
+    )
+    write(bwm, filepath)
+    bwm = parse(filepath)
+
+    parse_s, parse_peak = measure(lambda: parse(filepath), repeat)
+    write_s, write_peak = measure(lambda: write(bwm, result_path), repeat)
+    round_trip_s, round_trip_peak = measure(
+        lambda: round_trip(filepath, result_path), repeat
+    )
+
+    result = {
+        "layout": layout,
+        "version": version,
+        "vertices": vertex_count,
+        "file_bytes": os.path.getsize(filepath),
+        "parse_s": parse_s,
+        "write_s": write_s,
+        "round_trip_s": round_trip_s,
+        "parse_peak_bytes": parse_peak,
+        "write_peak_bytes": write_peak,
+        "round_trip_peak_bytes": round_trip_peak,
+    }
+    os.remove(filepath)
+    os.remove(result_path)
+
+    return result
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--vertices", type=int, nargs="+", default=[1000, 10000, 65536]
+    )
+    parser.add_argument(
+        "--layouts",
+        nargs="+",
+        choices=("model", "skin"),
+        default=["model", "skin"],
+    )
+    parser.add_argument("--versions", type=int, nargs="+", default=[5, 6])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", help="JSON file, stdout if unset")
+    options = parser.parse_args(args)
+
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        for layout in options.layouts:
+            for version in options.versions:
+                for vertex_count in options.vertices:
+                    results.append(
+                        run_case(
+                            directory,
+                            vertex_count,
+                            layout == "skin",
+                            version,
+                            options.repeat,
+                        )
+                    )
+
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "repeat": options.repeat,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if options.output:
+        with open(options.output, "w") as file:
+            file.write(output)
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
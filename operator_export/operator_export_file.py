@@ -6,9 +6,12 @@ a .bwm file
 import numpy as np
 import bpy
 
-from ..operator_utilities.vector_utils import xyz_to_zxy
+from ..operator_utilities.vector_utils import xyz_to_zxy, xyz_to_zxy_vectors
 
-from .operator_export_material import description_from_material
+from .operator_export_material import (
+    description_from_material,
+    exported_materials,
+)
 from .operator_export_rigging import create_bone_weigth_table
 
 from ..operator_utilities.file_definition_bwm import (
@@ -30,7 +33,7 @@ def organize_bwm_data(settings, collection: bpy.types.Collection) -> BWMFile:
     file = BWMFile()
 
     file.materialDefinitions = [
-        description_from_material(material) for material in bpy.data.materials
+        description_from_material(material) for material in exported_materials()
     ]
     file.modelHeader.materialDefinitionCount = len(file.materialDefinitions)
 
@@ -76,9 +79,12 @@ def organize_bwm_data(settings, collection: bpy.types.Collection) -> BWMFile:
             for obj in collision.objects.values():
                 if obj.type == "MESH":
                     obj = obj.to_mesh()
-                    for point in obj.vertices.values():
+                    points = np.empty(len(obj.vertices) * 3, dtype=np.float32)
+                    obj.vertices.foreach_get("co", points)
+                    points = xyz_to_zxy_vectors(points.reshape(-1, 3))
+                    for position in points.tolist():
                         col_point = CollisionPoint()
-                        col_point.position = xyz_to_zxy(point.co)
+                        col_point.position = tuple(position)
                         file.collisionPoints.append(col_point)
 
     meshes = collection.children.get("mesh")
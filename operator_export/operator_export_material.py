@@ -2,12 +2,24 @@
 Module charged with everything material related
 """
 # coding=utf-8
-from typing import Dict, Union
+from typing import Dict, List, Union
 import bpy
 
 from ..operator_utilities.file_definition_bwm import MaterialDefinition
 
 
+def exported_materials() -> List[bpy.types.Material]:
+    """
+    Materials of the file written as material definitions, the templates
+    the import copies its materials from are left out
+    """
+    return [
+        material
+        for material in bpy.data.materials
+        if "bwm_template" not in material
+    ]
+
+
 def get_texture_name(texture_node: bpy.types.TextureNode) -> str:
     """
     Get the name of an image used inside a Image node
@@ -5,8 +5,6 @@ vertices and indexes array.
 """
 # coding=utf-8
 from typing import Dict, List, Tuple
-import math
-from statistics import mean
 
 import numpy as np
 import bpy
@@ -21,7 +19,12 @@ from ..operator_utilities.file_definition_bwm import (
     Stride,
     UVType,
 )
-from ..operator_utilities.vector_utils import correct_uv, xyz_to_zxy
+from .operator_export_material import exported_materials
+from ..operator_utilities.vector_utils import (
+    correct_uv,
+    xyz_to_zxy,
+    xyz_to_zxy_vectors,
+)
 
 
 def organise_mesh_data(
@@ -34,7 +37,9 @@ def organise_mesh_data(
     """
     bwm_data.meshDescriptions = []
     m_type = bwm_data.modelHeader.type
-    l_materials = list(bpy.data.materials)
+    l_materials = exported_materials()
+    l_indexes = [bwm_data.indexes]
+    index_count = len(bwm_data.indexes)
 
     for lod in range(1, 5):
         lod_collection = mesh_collections.children.get(f"lod{lod}")
@@ -43,8 +48,9 @@ def organise_mesh_data(
                 if obj.type == "MESH":
                     mesh_desc = create_basic_description(obj, lod)
                     bwm_data.meshDescriptions.append(mesh_desc)
+                    positions, normals = vertex_arrays(obj.data.vertices)
 
-                    mesh_desc.indiciesOffset = len(bwm_data.indexes)
+                    mesh_desc.indiciesOffset = index_count
                     mesh_desc.vertexOffset = len(bwm_data.vertices)
                     vertex_offset = mesh_desc.vertexOffset
                     indicies_offset = mesh_desc.indiciesOffset
@@ -63,14 +69,15 @@ def organise_mesh_data(
                             continue
 
                         vertices_add, d_indexes = organise_vertex_data(
-                            l_polygons, obj.data.vertices, obj.data.uv_layers
+                            l_polygons, positions, normals, obj.data.uv_layers
                         )
                         bwm_data.vertices.extend(vertices_add)
 
                         indexes_add = organise_index_data(
                             l_polygons, vertex_offset, d_indexes, m_type
                         )
-                        bwm_data.indexes.extend(indexes_add)
+                        l_indexes.append(indexes_add)
+                        index_count += len(indexes_add)
 
                         # TODO Extract bone weight data
 
@@ -100,8 +107,9 @@ def organise_mesh_data(
                     mesh_desc.vertexSize -= mesh_desc.vertexOffset
 
                     mesh_desc.materialRefsCount = len(mesh_desc.materialRefs)
-                    create_bounds(mesh_desc, obj.data.vertices)
+                    create_bounds(mesh_desc, positions)
 
+    bwm_data.indexes = np.concatenate(l_indexes).astype("<u2")
     return bwm_data
 
 
@@ -135,9 +143,26 @@ def create_basic_description(
     return mesh_desc
 
 
+def vertex_arrays(
+    vertices: List[bpy.types.MeshVertex],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions and normals (Nx3) of the vertices of a mesh, in zxy coordinate
+    """
+    positions = np.empty(len(vertices) * 3, dtype=np.float32)
+    normals = np.empty(len(vertices) * 3, dtype=np.float32)
+    vertices.foreach_get("co", positions)
+    vertices.foreach_get("normal", normals)
+    return (
+        xyz_to_zxy_vectors(positions.reshape(-1, 3)),
+        xyz_to_zxy_vectors(normals.reshape(-1, 3)),
+    )
+
+
 def organise_vertex_data(
     polygons: List[bpy.types.MeshPolygon],
-    vertices: List[bpy.types.MeshVertex],
+    positions: np.ndarray,
+    normals: np.ndarray,
     uv_layers: List[bpy.types.MeshUVLoopLayer],
 ) -> Tuple[List[bpy.types.MeshVertex], Dict[int, int]]:
     """
@@ -157,10 +182,9 @@ def organise_vertex_data(
             if vert_idx in d_index:
                 continue
 
-            c_vertex = vertices[vert_idx]
             r_vertex = ret_vertices[vertex]
-            r_vertex.position = tuple(xyz_to_zxy(c_vertex.co))
-            r_vertex.normal = tuple(xyz_to_zxy(c_vertex.normal))
+            r_vertex.position = tuple(positions[vert_idx].tolist())
+            r_vertex.normal = tuple(normals[vert_idx].tolist())
             ret_vertices[vertex] = r_vertex
             d_index[vert_idx] = vertex
 
@@ -187,9 +211,9 @@ def organise_index_data(
     vertex_offset: int,
     d_indexes: Dict[int, int],
     m_type: int,
-) -> List[int]:
+) -> np.ndarray:
     """
-    Take the mesh faces and make an array of indexes from them
+    Take the mesh faces and make an uint16 array of indexes from them
     """
 
     if m_type == FileType.SKIN:
@@ -211,25 +235,26 @@ def organise_index_data(
         faces = [[index for index in face.vertices] for face in faces_seq]
         indexes = [index for i in range(len(faces)) for index in faces[i]]
 
-    indexes = [d_indexes[i] + vertex_offset for i in indexes]
-    return indexes
+    indexes = np.fromiter(
+        (d_indexes[i] for i in indexes), dtype=np.int64, count=len(indexes)
+    )
+    indexes += vertex_offset
+    if len(indexes) and indexes.max() > 0xFFFF:
+        raise ValueError("Too many vertices to be indexed on 16 bits")
+    return indexes.astype("<u2")
 
 
-def create_bounds(
-    mesh_desc: MeshDescription, vertices: List[bpy.types.MeshVertex]
-) -> None:
+def create_bounds(mesh_desc: MeshDescription, positions: np.ndarray) -> None:
     """
-    Compute the bounding box, sphere and the height of the mesh
+    Compute the bounding box, sphere and the height of the mesh from its
+    vertices positions (Nx3 in zxy coordinate)
     """
-    num_vertex = len(vertices)
-    mesh_desc.vertexSize = num_vertex
-    list_loc = [tuple(xyz_to_zxy(vertex.co)) for vertex in vertices]
-    list_x = [loc[0] for loc in list_loc]
-    list_y = [loc[1] for loc in list_loc]
-    list_z = [loc[2] for loc in list_loc]
-    mesh_desc.cent = (mean(list_x), mean(list_y), mean(list_z))
-    mesh_desc.box1 = (min(list_x), min(list_y), min(list_z))
-    mesh_desc.box2 = (max(list_x), max(list_y), max(list_z))
-    mesh_desc.radius = max([math.dist(loc, mesh_desc.cent) for loc in list_loc])
+    positions = np.asarray(positions, dtype=np.float64)
+    mesh_desc.vertexSize = len(positions)
+    cent = positions.mean(axis=0)
+    mesh_desc.cent = tuple(cent.tolist())
+    mesh_desc.box1 = tuple(positions.min(axis=0).tolist())
+    mesh_desc.box2 = tuple(positions.max(axis=0).tolist())
+    mesh_desc.radius = float(np.linalg.norm(positions - cent, axis=1).max())
     mesh_desc.unknowns1 = mesh_desc.box2
     mesh_desc.height = mesh_desc.box2[1]
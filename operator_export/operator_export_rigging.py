@@ -2,20 +2,28 @@
 This module handle the processing of skin rigging information from blender
 into the .bwm format
 """
-from typing import List, Union
-from ..operator_utilities.file_definition_bwm import BWMFile
+from typing import List
+import numpy as np
+from ..operator_utilities.file_definition_bwm import BWMFile, StrideType
 
 
 def create_bone_weigth_table(
     bwm_data: BWMFile,
-) -> List[List[Union[float, int]]]:
+) -> List[np.ndarray]:
     """
-    Create the bone/weight table of the skin for the .bwm file
+    Create the bone/weight table of the skin for the .bwm file, one column
+    per stride following the strides already set on the file
     """
-    bone_table = [[[0] for _ in bwm_data.vertices] for _ in range(4)]
-    weigth_table = [
-        [[0.0 if i > 0 else 1.0] for _ in bwm_data.vertices] for i in range(4)
+    vertex_count = len(bwm_data.vertices)
+    table = [
+        np.zeros(vertex_count, dtype=stride.dtype())
+        for stride in bwm_data.strides[1:]
     ]
 
-    bone_table.extend(weigth_table)
-    return bone_table
+    # Every vertex is fully weighted to the first bone
+    for stride, column in zip(bwm_data.strides[1:], table):
+        if stride.idSizes[0][0] == StrideType.BONE_WEIGHT:
+            column[column.dtype.names[0]] = 1.0
+            break
+
+    return table
@@ -3,12 +3,29 @@ Main module for the import plugin handle necessary code for its registration
 in blender and the UI.
 """
 # coding=utf-8
-from bpy.types import Operator
-from bpy.props import StringProperty
+from os import path
+from bpy.types import Operator, OperatorFileListElement
+from bpy.props import (
+    CollectionProperty,
+    EnumProperty,
+    IntProperty,
+    StringProperty,
+)
 from bpy_extras.io_utils import ImportHelper
 import bpy
 
-from .operator_import_file import read_bwm_data
+from ..operator_utilities.path_utils import find_bwm_files
+from .operator_import_file import read_bwm_batch, read_bwm_data, read_bwm_lods
+
+
+def lod_levels_property():
+    return EnumProperty(
+        name="LOD levels",
+        description="Levels of detail whose meshes are imported",
+        items=[(str(lod), f"LOD {lod}", "") for lod in range(1, 5)],
+        options={"ENUM_FLAG"},
+        default={"1", "2", "3", "4"},
+    )
 
 # ImportHelper is a helper class, defines filename and
 # invoke() function which calls the file selector.
@@ -29,21 +46,93 @@ class ImportBWMData(Operator, ImportHelper):
         options={"HIDDEN"},
         maxlen=255,  # Max internal buffer length, longer would be clamped.
     )
+    lod_levels: lod_levels_property()
+
+    def execute(self, context):
+        lods = {int(lod) for lod in self.lod_levels}
+        return read_bwm_data(context, self.filepath, lods)
+
+
+class ImportBWMBatch(Operator, ImportHelper):
+    """Import the selected .bwm files, or every one under the folder"""
+
+    bl_idname = "import_test.bwm_batch"
+    bl_label = "Import .bwm files"
+
+    filename_ext = ".bwm"
+
+    filter_glob: StringProperty(
+        default="*.bwm",
+        options={"HIDDEN"},
+        maxlen=255,
+    )
+    files: CollectionProperty(type=OperatorFileListElement)
+    directory: StringProperty(subtype="DIR_PATH")
+    jobs: IntProperty(
+        name="Processes",
+        description="Files parsed in parallel, 0 for one per CPU",
+        default=0,
+        min=0,
+    )
+    lod_levels: lod_levels_property()
+
+    def execute(self, context):
+        filepaths = [
+            path.join(self.directory, file.name)
+            for file in self.files
+            if file.name
+        ]
+        if not filepaths:
+            filepaths = find_bwm_files(self.directory)
+        lods = {int(lod) for lod in self.lod_levels}
+        return read_bwm_batch(context, filepaths, self.jobs or None, lods)
+
+
+class ImportBWMLods(Operator):
+    """Import the levels of detail an import of a .bwm file left out"""
+
+    bl_idname = "import_test.bwm_lods"
+    bl_label = "Import other .bwm LODs"
+    bl_options = {"REGISTER", "UNDO"}
+
+    lod_levels: lod_levels_property()
+
+    @classmethod
+    def poll(cls, context):
+        col = context.collection
+        return col is not None and "bwm_filepath" in col
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self)
 
     def execute(self, context):
-        return read_bwm_data(context, self.filepath)
+        lods = {int(lod) for lod in self.lod_levels}
+        return read_bwm_lods(context, context.collection, lods)
 
 
 # Only needed if you want to add into a dynamic menu
+def menu_func_lods(self, context):
+    self.layout.operator(ImportBWMLods.bl_idname)
+
+
 def menu_func_import(self, context):
     self.layout.operator(
         ImportBWMData.bl_idname, text="Black & White Model (.bwm)"
     )
+    self.layout.operator(
+        ImportBWMBatch.bl_idname, text="Black & White Models (.bwm, batch)"
+    )
 
 
 def register():
     bpy.utils.register_class(ImportBWMData)
+    bpy.utils.register_class(ImportBWMBatch)
+    bpy.utils.register_class(ImportBWMLods)
+    bpy.types.OUTLINER_MT_collection.append(menu_func_lods)
 
 
 def unregister():
+    bpy.types.OUTLINER_MT_collection.remove(menu_func_lods)
+    bpy.utils.unregister_class(ImportBWMLods)
+    bpy.utils.unregister_class(ImportBWMBatch)
     bpy.utils.unregister_class(ImportBWMData)
@@ -3,9 +3,16 @@ Main module contains only the function to transform data from a .bwm file into
 a Blender collection
 """
 # coding=utf-8
-import logging
-from typing import List, Union
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from struct import error as struct_error
+from typing import Collection, Iterable, List, Optional, Union
 from os import path
+import logging
+import multiprocessing
+
+import numpy as np
 import bpy
 
 from ..operator_utilities.file_definition_bwm import (
@@ -14,19 +21,46 @@ from ..operator_utilities.file_definition_bwm import (
     Bone,
     Entity,
     Unknown1,
-    CollisionPoint
+    CollisionPoint,
+    MeshDescription,
+    iter_sections,
+)
+from .operator_import_geometry import (
+    LOD_LEVELS,
+    MeshGeometry,
+    decode_bwm,
+    uv_names,
+)
+from .operator_import_material import (
+    TexturePrefetch,
+    bpy_material_from_definition,
+)
+from .operator_import_mesh import (
+    apply_material_to_mesh,
+    bpy_mesh_from_definition,
+    fill_mesh,
+    setup_mesh_uvlayers,
 )
-from .operator_import_material import bpy_material_from_definition
-from .operator_import_mesh import bpy_obj_from_defintion
 from ..operator_utilities.vector_utils import (
-    zxy_to_xyz,
-    construct_transformation_matrix,
+    zxy_to_xyz_matrices,
+    zxy_to_xyz_vectors,
+    construct_transformation_matrices,
 )
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 logger.addHandler(logging.StreamHandler())
 
+# Raised by a file that can't be read or whose counts and indexes are
+# inconsistent, a batch skips it
+MALFORMED_FILE_ERRORS = (
+    OSError,
+    ValueError,
+    IndexError,
+    KeyError,
+    struct_error,
+)
+
 def collection_arrows(name: str, collection: List[Union[Bone, Entity]], draw_size: float, col: bpy.types.Collection):
     """
     Add a simple collection of oriented point inside a blender collection
@@ -34,11 +68,12 @@ def collection_arrows(name: str, collection: List[Union[Bone, Entity]], draw_siz
     logger.info("Loading %s from .bwm", name)
     if collection:
         n_col = bpy.data.collections.new(name)
-        for object_desc in collection:
+        matrices = construct_transformation_matrices(
+            collection, zxy_to_xyz_matrices
+        )
+        for object_desc, matrix in zip(collection, matrices.tolist()):
             blender_obj = bpy.data.objects.new(object_desc.name, None)
-            blender_obj.matrix_world = construct_transformation_matrix(
-                object_desc, zxy_to_xyz
-            )
+            blender_obj.matrix_world = matrix
 
             blender_obj.empty_display_size = draw_size
             blender_obj.empty_display_type = "ARROWS"
@@ -51,64 +86,172 @@ def collection_points(name: str, collection: List[Union[Unknown1, CollisionPoint
     """
     Add a simple collection of point inside a blender collection
     """
-    data_col = [zxy_to_xyz(data.position) for data in collection]
     if collection:
+        data_col = zxy_to_xyz_vectors(
+            np.array([data.position for data in collection], dtype=np.float32)
+        )
         mesh = bpy.data.meshes.new(name)
         obj = bpy.data.objects.new(mesh.name, mesh)
-        mesh.from_pydata(data_col, [], [])
+        fill_mesh(mesh, data_col, np.empty((0, 3), dtype=np.int32))
 
         n_col = bpy.data.collections.new(name)
         n_col.objects.link(obj)
         col.children.link(n_col)
 
-def read_bwm_data(context, filepath: str):
+def read_bwm_data(
+    context, filepath: str, lods: Collection[int] = LOD_LEVELS
+):
     """
-    Organize data from a .bwm file inside a Blender collection
+    Organize data from a .bwm file inside a Blender collection, only the
+    meshes of the lods levels are built
     """
     logger.info("Reading data from Black & White Model file")
-    with open(filepath, "rb") as file:
-        bwm = BWMFile(file)
-        uvs_count = len(bwm.vertices[0].uvs)
-
-        model_type = bwm.modelHeader.type
-        bwm_name = path.basename(filepath[:-4])
+    textures = prefetch_textures(filepath, lods)
+    build_bwm_collection(
+        context, filepath, *decode_bwm(filepath, lods), textures, lods=lods
+    )
 
-        col = bpy.data.collections.new(bwm_name)
+    return {"FINISHED"}
 
-        if not (model_type in (FileType.SKIN, FileType.MODEL)):
-            raise ValueError("Not a supported type")
 
-        logger.info("Creating material from definition")
-        list_materials, list_uv_nodes = zip(
-            *[
-                bpy_material_from_definition(
-                    material_definition,
-                    path.join(path.dirname(filepath), "..\\textures"),
-                    uvs_count,
-                )
-                for material_definition in bwm.materialDefinitions
-            ]
-        )
+def read_bwm_lods(
+    context,
+    col: bpy.types.Collection,
+    lods: Collection[int] = LOD_LEVELS,
+):
+    """
+    Add to the collection of an import the meshes of the lods levels it
+    didn't import yet
+    """
+    filepath = col["bwm_filepath"]
+    lods = sorted(set(lods) - set(col["bwm_lods"]))
+    if not lods:
+        return {"FINISHED"}
 
+    logger.info("Reading lods %s from Black & White Model file", lods)
+    textures = prefetch_textures(filepath, lods)
+    bwm, geometries = decode_bwm(filepath, lods)
+    mesh_col = child_collection(col, "mesh")
+    if mesh_col is None:
         mesh_col = bpy.data.collections.new("mesh")
         col.children.link(mesh_col)
-        lods = [[] for _ in range(4)]
+    build_bwm_meshes(filepath, bwm, geometries, textures, mesh_col)
+    col["bwm_lods"] = sorted(set(col["bwm_lods"]) | set(lods))
 
-        logger.info("Creating mesh from definition")
-        for mesh_description in bwm.meshDescriptions:
-            obj = bpy_obj_from_defintion(
-                mesh_description, bwm, list_materials, list_uv_nodes, bwm_name
-            )
+    return {"FINISHED"}
 
-            lods[mesh_description.lod_level - 1].append(obj)
 
-        logger.info("Put mesh into lods")
-        for lod_level, meshses in enumerate(lods):
-            if meshses:
-                n_col = bpy.data.collections.new(f"lod{lod_level + 1}")
-                for mesh in meshses:
-                    n_col.objects.link(mesh)
-                mesh_col.children.link(n_col)
+def read_bwm_batch(
+    context,
+    filepaths: Iterable[str],
+    jobs: Optional[int] = None,
+    lods: Collection[int] = LOD_LEVELS,
+):
+    """
+    Organize data from many .bwm files each inside a Blender collection. The
+    files are parsed and decoded by a pool of jobs processes, the Blender
+    data is created here as soon as each file is ready.
+    """
+    filepaths = list(filepaths)
+    lods = tuple(lods)
+    logger.info("Reading %d Black & White Model files", len(filepaths))
+    # Each file is decoded when its callable is called, so that a broken
+    # file only fails its own import. Its textures are read meanwhile.
+    if len(filepaths) < 2 or jobs == 1:
+        decoders = [partial(decode_bwm, f, lods) for f in filepaths]
+        executor = None
+    else:
+        # Workers import the add-on without bpy, forking Blender isn't safe.
+        # They don't keep the files they parse, the session cache is here.
+        executor = ProcessPoolExecutor(
+            max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+        )
+        decoders = [
+            executor.submit(decode_bwm, f, lods, cached=False).result
+            for f in filepaths
+        ]
+
+    try:
+        for filepath, decode in zip(filepaths, decoders):
+            try:
+                textures = prefetch_textures(filepath, lods)
+                build_bwm_collection(
+                    context, filepath, *decode(), textures, lods=lods
+                )
+            except MALFORMED_FILE_ERRORS:
+                logger.error("Could not import %s", filepath, exc_info=True)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+
+    return {"FINISHED"}
+
+
+def texture_directory(filepath: str) -> str:
+    return path.join(path.dirname(filepath), "..", "textures")
+
+
+def used_materials(mesh_descriptions: Iterable[MeshDescription]) -> List[int]:
+    """Indexes of the material definitions the meshes refer to"""
+    return sorted(
+        {
+            material_reference.materialDefinition
+            for mesh_description in mesh_descriptions
+            for material_reference in mesh_description.materialRefs
+        }
+    )
+
+
+def prefetch_textures(
+    filepath: str, lods: Collection[int] = LOD_LEVELS
+) -> TexturePrefetch:
+    """
+    Start reading the textures used by the meshes of the lods levels, from
+    the metadata at the start of the file, so that they are read while the
+    file is parsed and decoded
+    """
+    with open(filepath, "rb") as reader:
+        # Headers, material definitions and mesh descriptions
+        sections = dict(islice(iter_sections(reader, metadataOnly=True), 4))
+    material_definitions = sections["materialDefinitions"]
+    used = used_materials(
+        mesh_description
+        for mesh_description in sections["meshDescriptions"]
+        if mesh_description.lod_level in lods
+    )
+    return TexturePrefetch(
+        texture_directory(filepath), [material_definitions[i] for i in used]
+    )
+
+
+def build_bwm_collection(
+    context,
+    filepath: str,
+    bwm: BWMFile,
+    geometries: List[Optional[MeshGeometry]],
+    textures: TexturePrefetch,
+    lods: Collection[int] = LOD_LEVELS,
+) -> bpy.types.Collection:
+    """
+    Create the Blender collection of a file from its parsed data and decoded
+    meshes (as returned by decode_bwm for the lods levels) and its textures
+    (from prefetch_textures). The file and its levels are kept on the
+    collection to add the others later.
+    """
+    model_type = bwm.modelHeader.type
+    bwm_name = path.basename(filepath[:-4])
+
+    col = bpy.data.collections.new(bwm_name)
+    col["bwm_filepath"] = filepath
+    col["bwm_lods"] = sorted(lods)
+
+    try:
+        if not (model_type in (FileType.SKIN, FileType.MODEL)):
+            raise ValueError("Not a supported type")
+
+        mesh_col = bpy.data.collections.new("mesh")
+        col.children.link(mesh_col)
+        build_bwm_meshes(filepath, bwm, geometries, textures, mesh_col)
 
         logger.info("Loading additional mesh data")
         draw_size = bwm.modelHeader.height / 20
@@ -117,7 +260,105 @@ def read_bwm_data(context, filepath: str):
 
         collection_points("unknowns", bwm.unknowns1, col)
         collection_points("collision", bwm.collisionPoints, col)
+    except Exception:
+        # A file that failed leaves nothing behind
+        remove_collection(col)
+        raise
 
-        bpy.context.scene.collection.children.link(col)
+    bpy.context.scene.collection.children.link(col)
 
-    return {"FINISHED"}
+    return col
+
+
+def build_bwm_meshes(
+    filepath: str,
+    bwm: BWMFile,
+    geometries: List[Optional[MeshGeometry]],
+    textures: TexturePrefetch,
+    mesh_col: bpy.types.Collection,
+) -> None:
+    """
+    Create the meshes with a geometry, and the materials they use, into the
+    lod collections of mesh_col
+    """
+    uvs_count = len(uv_names(bwm))
+    built = [
+        (mesh_description, geometry)
+        for mesh_description, geometry in zip(bwm.meshDescriptions, geometries)
+        if geometry is not None
+    ]
+    used = used_materials(mesh_description for mesh_description, _ in built)
+    texture_path = texture_directory(filepath)
+
+    lods = [[] for _ in range(4)]
+
+    logger.info("Creating mesh from definition")
+    meshes = []
+    for mesh_description, geometry in built:
+        obj, mesh, face_sources = bpy_mesh_from_definition(
+            mesh_description, bwm, geometry
+        )
+        uv_layers = setup_mesh_uvlayers(mesh, geometry[4])
+        meshes.append((mesh_description, obj, mesh, uv_layers, face_sources))
+
+        lods[mesh_description.lod_level - 1].append(obj)
+
+    # Linked before anything else can fail, so that removing the collection
+    # of a failed import removes them
+    logger.info("Put mesh into lods")
+    for lod_level, meshses in enumerate(lods):
+        if meshses:
+            n_col = child_collection(mesh_col, f"lod{lod_level + 1}")
+            if n_col is None:
+                n_col = bpy.data.collections.new(f"lod{lod_level + 1}")
+                mesh_col.children.link(n_col)
+            for mesh in meshses:
+                n_col.objects.link(mesh)
+
+    logger.info("Creating material from definition")
+    list_materials = [None] * len(bwm.materialDefinitions)
+    list_uv_nodes = [None] * len(bwm.materialDefinitions)
+    for i in used:
+        list_materials[i], list_uv_nodes[i] = bpy_material_from_definition(
+            bwm.materialDefinitions[i], texture_path, uvs_count, textures
+        )
+
+    logger.info("Applying material to mesh")
+    for mesh_description, obj, mesh, uv_layers, face_sources in meshes:
+        apply_material_to_mesh(
+            obj,
+            mesh,
+            uv_layers,
+            mesh_description.materialRefs,
+            list_materials,
+            list_uv_nodes,
+            face_sources,
+        )
+
+
+def remove_collection(col: bpy.types.Collection) -> None:
+    """
+    Remove a collection with its children and their objects, and the meshes
+    no other object uses
+    """
+    for child in list(col.children):
+        remove_collection(child)
+    for obj in list(col.objects):
+        data = obj.data
+        bpy.data.objects.remove(obj)
+        if isinstance(data, bpy.types.Mesh) and data.users == 0:
+            bpy.data.meshes.remove(data)
+    bpy.data.collections.remove(col)
+
+
+def child_collection(
+    col: bpy.types.Collection, name: str
+) -> Optional[bpy.types.Collection]:
+    """
+    Child collection created with the name, Blender may have suffixed it
+    (lod1.001) since collection names are unique
+    """
+    for child in col.children:
+        if child.name.split(".")[0] == name:
+            return child
+    return None
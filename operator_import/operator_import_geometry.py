@@ -0,0 +1,109 @@
+"""
+Module charged with decoding the geometry of the meshes of a .bwm file into
+the flat arrays Blender meshes are built from. It doesn't depend on bpy so
+that files can be decoded in worker processes.
+"""
+# coding=utf-8
+from typing import Collection, List, Optional, Tuple
+import numpy as np
+
+from ..operator_utilities.bwm_cache import parsed_models
+from ..operator_utilities.file_definition_bwm import (
+    FileType,
+    MeshDescription,
+    BWMFile,
+)
+from ..operator_utilities.strip_utils import strip_to_triangles
+from ..operator_utilities.vector_utils import correct_uvs, zxy_to_xyz_vectors
+
+# Positions (Nx3), normals (Nx3), faces (Mx3), strip index of each face
+# (None for models) and uvs (uv maps x N x 2)
+MeshGeometry = Tuple[
+    np.ndarray, np.ndarray, np.ndarray, Optional[np.ndarray], np.ndarray
+]
+
+LOD_LEVELS = (1, 2, 3, 4)
+
+
+def uv_names(bwm: BWMFile) -> List[str]:
+    """Fields of the vertex block holding uvs, one per uv map"""
+    return [
+        name for name in bwm.strides[0].dtype().names if name.startswith("uv")
+    ]
+
+
+def vertex_uvs(vertices: np.ndarray, names: List[str]) -> np.ndarray:
+    """
+    Blender uvs of a slice of the vertex block, shaped (uv maps, vertices, 2)
+    """
+    uvs = np.empty((len(names), len(vertices), 2), dtype=np.float32)
+    for i, name in enumerate(names):
+        uvs[i] = vertices[name]
+    return correct_uvs(uvs)
+
+
+def mesh_geometry(
+    mesh_description: MeshDescription, bwm: BWMFile
+) -> MeshGeometry:
+    """
+    Extract the geometry of the mesh from the description, in Blender
+    coordinate and with faces indexing the vertices of the mesh
+    """
+    file_type = bwm.modelHeader.type
+
+    # Reading mesh information from the mesh description
+    indicies_offset = mesh_description.indiciesOffset
+    indicies_size = mesh_description.indiciesSize
+    vertex_offset = mesh_description.vertexOffset
+    vertex_size = mesh_description.vertexSize
+
+    # Skins work differently from models
+    if file_type == FileType.SKIN and indicies_offset > 0:
+        indicies_offset += 2
+
+    mesh_indexes = bwm.indexes[
+        indicies_offset : indicies_size + indicies_offset
+    ].astype(np.int32)
+    mesh_vertices = bwm.vertexData[vertex_offset : vertex_size + vertex_offset]
+    positions = zxy_to_xyz_vectors(mesh_vertices["position"])
+    normals = zxy_to_xyz_vectors(mesh_vertices["normal"])
+    uvs = vertex_uvs(mesh_vertices, uv_names(bwm))
+
+    face_sources = None
+    if file_type == FileType.MODEL:
+        faces = mesh_indexes[: indicies_size - indicies_size % 3]
+    if file_type == FileType.SKIN:
+        faces, face_sources = strip_to_triangles(
+            mesh_indexes, return_index=True
+        )
+    faces = faces.reshape(-1, 3) - vertex_offset
+
+    return positions, normals, faces, face_sources, uvs
+
+
+def decode_bwm(
+    filepath: str, lods: Collection[int] = LOD_LEVELS, cached: bool = True
+) -> Tuple[BWMFile, List[Optional[MeshGeometry]]]:
+    """
+    Parse a file and decode the geometry of its meshes of the lods levels,
+    everything the import needs before creating Blender data. The geometry
+    of the meshes of other levels is None.
+    Full imports go through the session cache. When some levels are left
+    out, or cached is False (worker processes which never reuse a file),
+    the file is memory mapped (lazy BWMFile) and only the vertices and
+    indexes of the meshes of the lods levels are read. A lazy file is
+    pickled with its metadata only, all the import needs next to the
+    geometry, so that workers don't send the bulk data back.
+    """
+    if cached and set(LOD_LEVELS) <= set(lods):
+        bwm = parsed_models.load(filepath)
+    else:
+        with open(filepath, "rb") as reader:
+            bwm = BWMFile(reader, lazy=True)
+    geometries = [
+        mesh_geometry(mesh_description, bwm)
+        if mesh_description.lod_level in lods
+        else None
+        for mesh_description in bwm.meshDescriptions
+    ]
+    return bwm, geometries
@@ -2,23 +2,45 @@
 Module charged with everything material related
 """
 # coding=utf-8
-import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from os import path
-from typing import List, Tuple, Dict
+from typing import Iterable, List, Optional, Tuple, Dict
+import logging
 import bpy
 
 from ..operator_utilities.file_definition_bwm import MaterialDefinition
 
+# Name of the materials created and images loaded by the imports, by
+# material_key and by image path, and of the material templates by layout
+imported_materials: Dict[Tuple, str] = {}
+imported_images: Dict[str, str] = {}
+material_templates: Dict[Tuple, str] = {}
 
-def bpy_material_from_definition(
+
+def material_key(
     material_definition: MaterialDefinition, texture_path: str, uvs_count: int
-) -> Tuple[bpy.types.Material, List[bpy.types.NodeInputs]]:
+) -> Tuple:
     """
-    Translate black & white 2 material defintion into a Blender material
+    Everything a material is built from, imports of the same key share it
     """
-    logger = logging.getLogger(__name__)
+    return (
+        material_definition.diffuseMap,
+        material_definition.lightMap,
+        material_definition.growthMap,
+        material_definition.specularMap,
+        material_definition.animatedTexture,
+        material_definition.normalMap,
+        material_definition.type,
+        path.normpath(texture_path),
+        uvs_count,
+    )
 
-    images = [
+
+def texture_files(material_definition: MaterialDefinition) -> List[str]:
+    """
+    Texture files of a material, in the order of the nodes of its layout
+    """
+    return [
         material_definition.diffuseMap,
         material_definition.specularMap,
         material_definition.lightMap,
@@ -26,19 +48,178 @@ def bpy_material_from_definition(
         material_definition.growthMap,
         material_definition.animatedTexture,
     ]
+
+
+def read_texture(filepath: str) -> None:
+    """
+    Read a texture file so that Blender later loads it from the system
+    cache, nothing waits on it
+    """
+    try:
+        with open(filepath, "rb") as reader:
+            while reader.read(1 << 20):
+                pass
+    except OSError:
+        pass
+
+
+class TexturePrefetch:
+    """
+    Check on a thread pool that the texture files of material definitions
+    exist, as soon as they are known, then read them in the background so
+    that slow disks (network shares) are read while the meshes are built
+    """
+
+    def __init__(
+        self,
+        texture_path: str,
+        material_definitions: Iterable[MaterialDefinition],
+        workers: int = 8,
+    ):
+        self._checks: Dict[str, Future] = {}
+        executor = ThreadPoolExecutor(max_workers=workers)
+        for material_definition in material_definitions:
+            for file in texture_files(material_definition):
+                filepath = path.normpath(path.join(texture_path, file))
+                if file == "" or filepath in self._checks:
+                    continue
+                # Images already loaded by a previous import aren't read
+                if bpy.data.images.get(imported_images.get(filepath, "")):
+                    continue
+                self._checks[filepath] = executor.submit(
+                    path.isfile, filepath
+                )
+        # Queued after every check, so that checks never wait on a read
+        for filepath in self._checks:
+            executor.submit(read_texture, filepath)
+        executor.shutdown(wait=False)
+
+    def exists(self, filepath: str) -> bool:
+        """Wait for the file to be checked, True if it exists"""
+        check = self._checks.get(path.normpath(filepath))
+        return check is None or check.result()
+
+
+def bpy_material_from_definition(
+    material_definition: MaterialDefinition,
+    texture_path: str,
+    uvs_count: int,
+    textures: Optional[TexturePrefetch] = None,
+) -> Tuple[bpy.types.Material, List[bpy.types.NodeInputs]]:
+    """
+    Translate black & white 2 material defintion into a Blender material,
+    reusing the material of a previous import of the same definition.
+    Textures missing from the prefetch are skipped without loading them.
+    """
+    key = material_key(material_definition, texture_path, uvs_count)
+    material = bpy.data.materials.get(imported_materials.get(key, ""))
+    # The material may have been renamed or replaced since
+    if material is None or material.get("bwm_key") != repr(key):
+        material, uv_maps = create_material(
+            material_definition, texture_path, uvs_count, textures
+        )
+        material["bwm_key"] = repr(key)
+        imported_materials[key] = material.name
+        return (material, uv_maps)
+
+    nodes = material.node_tree.nodes
+    uv_maps = [nodes.get(f"uv_maps[{i}]") for i in range(uvs_count)]
+    return (material, uv_maps)
+
+
+def load_image(filepath: str) -> bpy.types.Image:
+    """
+    Image of the file, loaded only if no import loaded it yet
+    """
+    filepath = path.normpath(filepath)
+    image = bpy.data.images.get(imported_images.get(filepath, ""))
+    if image is None or path.normpath(image.filepath) != filepath:
+        image = bpy.data.images.load(filepath=filepath, check_existing=True)
+        imported_images[filepath] = image.name
+    return image
+
+
+def create_material(
+    material_definition: MaterialDefinition,
+    texture_path: str,
+    uvs_count: int,
+    textures: Optional[TexturePrefetch] = None,
+) -> Tuple[bpy.types.Material, List[bpy.types.NodeInputs]]:
+    """
+    Build a new Blender material from a black & white 2 material defintion,
+    as a copy of the template of its layout with its images set
+    """
+    logger = logging.getLogger(__name__)
+
+    images = texture_files(material_definition)
     texture_type = material_definition.type
 
-    material = bpy.data.materials.new(name=texture_type)
-    material.use_nodes = True
+    loaded_images = []
+    for file in images:
+        image = None
+        filepath = path.join(texture_path, file)
+        if file != "" and textures and not textures.exists(filepath):
+            logger.error("Could not find %s", file)
+        elif file != "":
+            try:
+                image = load_image(filepath)
+            except RuntimeError:
+                logger.error("Could not find %s", file, exc_info=True)
+        loaded_images.append(image)
+
     if texture_type == "_plants_" or texture_type == "_yard_" or texture_type == "_vines_":
-        material.blend_method = "BLEND"
+        blend_method = "BLEND"
     else:
-        material.blend_method = "HASHED"
+        blend_method = "HASHED"
+
+    layout = tuple(image is not None for image in loaded_images)
+    template = material_template(layout, uvs_count, blend_method)
+    material = template.copy()
+    del material["bwm_template"]
+    material.name = texture_type
+
+    material_nodes = material.node_tree.nodes
+    for i, image in enumerate(loaded_images):
+        if image is not None:
+            material_nodes[f"texture[{i}]"].image = image
+    uv_maps = [material_nodes[f"uv_maps[{i}]"] for i in range(uvs_count)]
+
+    return (material, uv_maps)
+
+
+def material_template(
+    layout: Tuple[bool, ...], uvs_count: int, blend_method: str
+) -> bpy.types.Material:
+    """
+    Material with the nodes of every material of the layout (which images
+    are present), built by the first import that needs it
+    """
+    key = (layout, uvs_count, blend_method)
+    template = bpy.data.materials.get(material_templates.get(key, ""))
+    if template is None or template.get("bwm_template") != repr(key):
+        template = build_material_template(layout, uvs_count, blend_method)
+        template["bwm_template"] = repr(key)
+        material_templates[key] = template.name
+    return template
+
+
+def build_material_template(
+    layout: Tuple[bool, ...], uvs_count: int, blend_method: str
+) -> bpy.types.Material:
+    """
+    Build the nodes of a material, with an empty image node for each image
+    present in layout
+    """
+    material = bpy.data.materials.new(name=".bwm_template")
+    material.use_nodes = True
+    material.blend_method = blend_method
     material.alpha_threshold = 1.0
 
     material_nodes = material.node_tree.nodes
     material_link = material.node_tree.links
     uv_maps = [material_nodes.new("ShaderNodeUVMap") for i in range(uvs_count)]
+    for i, uv_map in enumerate(uv_maps):
+        uv_map.name = f"uv_maps[{i}]"
 
     BSDF = material_nodes["Principled BSDF"]
 
@@ -66,23 +247,19 @@ def bpy_material_from_definition(
     for i in range(uvs_count):
         node_dict[f"uv_maps[{i}]"] = uv_maps[i]
 
-    for (file, inputs, outputs) in zip(images, l_inputs, l_outputs):
-        try:
-            if file != "":
-                image = bpy.data.images.load(
-                    filepath=path.join(texture_path, file), check_existing=True
+    for i, (present, inputs, outputs) in enumerate(
+        zip(layout, l_inputs, l_outputs)
+    ):
+        if present:
+            texture = material_nodes.new("ShaderNodeTexImage")
+            texture.name = f"texture[{i}]"
+            node_dict["texture"] = texture
+            for (node_input, output) in zip(inputs, outputs):
+                n_input = node_dict[node_input[0]]
+                n_output = node_dict[output[0]]
+
+                material_link.new(
+                    n_input.inputs.get(node_input[1]), n_output.outputs.get(output[1])
                 )
-                texture = material_nodes.new("ShaderNodeTexImage")
-                texture.image = image
-                node_dict["texture"] = texture
-                for (node_input, output) in zip(inputs, outputs):
-                    n_input = node_dict[node_input[0]]
-                    n_output = node_dict[output[0]]
-
-                    material_link.new(
-                        n_input.inputs.get(node_input[1]), n_output.outputs.get(output[1])
-                    )
-        except RuntimeError:
-            logger.error("Could not find %s", file, exc_info=True)
 
-    return (material, uv_maps)
+    return material
@@ -3,72 +3,39 @@ Module charged with creating the meshses from their description and apply to
 them the materials defined in the material references
 """
 # coding=utf-8
-from typing import List, Tuple
+from typing import Dict, List, Tuple
+import numpy as np
 import bpy
 
 from ..operator_utilities.file_definition_bwm import (
-    FileType,
     UVType,
     MaterialRef,
     MeshDescription,
     BWMFile,
 )
-from ..operator_utilities.vector_utils import correct_uv, zxy_to_xyz
+from .operator_import_geometry import MeshGeometry, mesh_geometry
 
 # Section
-def bpy_obj_from_defintion(
-    mesh_description: MeshDescription,
-    bwm: BWMFile,
-    list_materials: List[bpy.types.Material],
-    list_uv_nodes: List[bpy.types.NodeInputs],
-    bwm_name: str,
-):
-    """
-    From the data in the BWM and a mesh description call all necessary step
-    to make a mesh
-    """
-    obj, mesh = bpy_mesh_from_definition(mesh_description, bwm)
-
-    uv_layers = setup_mesh_uvlayers(
-        mesh, mesh_description.vertexOffset, bwm_name, bwm
-    )
-
-    apply_material_to_mesh(
-        obj,
-        mesh,
-        uv_layers,
-        mesh_description.materialRefs,
-        list_materials,
-        list_uv_nodes,
-    )
-
-    return obj
-
-
 def setup_mesh_uvlayers(
     mesh: bpy.types.Mesh,
-    vertex_offset: int,
-    bwm_name: str,
-    bwm: BWMFile,
+    uvs: np.ndarray,
 ) -> List[bpy.types.MeshUVLoopLayer]:
     """
-    Set up the uv of the differents polygons of the mesh.
+    Set up the uv of the differents polygons of the mesh from the uvs of its
+    vertices. Layers are named after their UVType only, so that materials
+    shared between files find them.
     """
-    uvs_count = len(bwm.vertices[0].uvs)
-    mesh_uvs = [
-        [correct_uv(vertex.uvs[i]) for vertex in bwm.vertices]
-        for i in range(uvs_count)
-    ]
+    uvs_count = len(uvs)
+    loop_vertices = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", loop_vertices)
+    mesh_uvs = uvs[:, loop_vertices]
 
     if len(mesh.uv_layers) < uvs_count:
         for i in range(uvs_count):
-            mesh.uv_layers.new(name=f"{bwm_name}_{UVType(i).name}")
+            mesh.uv_layers.new(name=UVType(i).name)
 
-    for i, uv_layer in enumerate(mesh.uv_layers):
-        for loop in mesh.loops.values():
-            vertex_index = loop.vertex_index + vertex_offset
-            loop_index = loop.index
-            uv_layer.data[loop_index].uv = mesh_uvs[i][vertex_index]
+    for uv_layer, layer_uvs in zip(mesh.uv_layers, mesh_uvs):
+        uv_layer.data.foreach_set("uv", layer_uvs.ravel())
 
     return mesh.uv_layers
 
@@ -80,86 +47,92 @@ def apply_material_to_mesh(
     material_references: List[MaterialRef],
     list_materials: List[bpy.types.Material],
     list_uv_nodes: List[bpy.types.NodeInputs],
+    face_sources: np.ndarray = None,
 ) -> None:
     """
-    Apply the Materials to the mesh
+    Apply the Materials to the mesh, each material gets one slot and its uv
+    map nodes are wired once whatever the number of references to it.
+    face_sources is the index of the triangle referenced by the materials
+    of each polygon, when some were dropped (degenerate strip triangles).
     """
-    # Set up materials
-    face_offset = 0
+    if face_sources is None:
+        face_sources = np.arange(len(mesh.polygons))
+    source_count = int(face_sources[-1]) + 1 if len(face_sources) else 0
+    material_indexes = np.zeros(source_count, dtype=np.int32)
+    slots: Dict[int, int] = {}
     for material_reference in material_references:
         material_definiton = material_reference.materialDefinition
-        current_material = list_materials[material_definiton]
-        obj.data.materials.append(current_material)
+        if material_definiton not in slots:
+            slots[material_definiton] = len(obj.data.materials)
+            obj.data.materials.append(list_materials[material_definiton])
+
+            # Apply the uv maps
+            uv_nodes = list_uv_nodes[material_definiton]
+            for uv_node, uv_layer in zip(uv_nodes, uv_layers):
+                uv_node.uv_map = uv_layer.name
 
         face_offset = material_reference.facesOffset
-        # Apply the uv maps
-        for i, uv_layer in enumerate(uv_layers):
-            uv_node = list_uv_nodes[material_definiton][i]
-            uv_node.uv_map = uv_layer.name
+        material_indexes[
+            face_offset : face_offset + material_reference.facesSize
+        ] = slots[material_definiton]
 
-        # Apply the materials
-        for polygon in mesh.polygons[face_offset:face_offset + material_reference.facesSize]:
-            polygon.material_index = len(obj.data.materials) - 1
-        
-        face_offset += material_reference.facesSize
+    # Apply the materials
+    mesh.polygons.foreach_set(
+        "material_index", material_indexes[face_sources]
+    )
 
 
 def bpy_mesh_from_definition(
     mesh_description: MeshDescription,
     bwm: BWMFile,
-) -> Tuple[bpy.types.Object, bpy.types.Material]:
+    geometry: MeshGeometry = None,
+) -> Tuple[bpy.types.Object, bpy.types.Mesh, np.ndarray]:
     """
-    Extract the geometry of the mesh from the description and build the mesh
+    Build the mesh from its geometry, decoded from the description if
+    missing, also return the index in the strip of each polygon for skins
+    (None for models)
     """
-    file_type = bwm.modelHeader.type
-
-    # Reading mesh information from the mesh description
+    if geometry is None:
+        geometry = mesh_geometry(mesh_description, bwm)
+    vertices_positions, mesh_normals, mesh_faces, face_sources, _ = geometry
     mesh_name = mesh_description.name.replace("\0", "")
-    indicies_offset = mesh_description.indiciesOffset
-    indicies_size = mesh_description.indiciesSize
-    vertex_offset = mesh_description.vertexOffset
-    vertex_size = mesh_description.vertexSize
-
-    def create_face(indexes):
-        return [index - vertex_offset for index in indexes]
-
-    # Skins work differently from models
-    if file_type == FileType.SKIN and indicies_offset > 0:
-        indicies_offset += 2
-
-    # Set up mesh geometry
-    mesh_indexes = bwm.indexes[
-        indicies_offset : indicies_size + indicies_offset
-    ]
-    mesh_vertices = bwm.vertices[vertex_offset : vertex_size + vertex_offset]
-    vertices_positions = [
-        zxy_to_xyz(vertex.position) for vertex in mesh_vertices
-    ]
-    mesh_normals = [zxy_to_xyz(vertex.normal) for vertex in mesh_vertices]
-
-    if file_type == FileType.MODEL:
-        mesh_faces = [
-            create_face(mesh_indexes[i : i + 3])
-            for i in range(0 , mesh_description.indiciesSize, 3)
-        ]
-    if file_type == FileType.SKIN:
-        mesh_faces = [
-            create_face(mesh_indexes[i : i + 3])
-            if (i % 2 == 0)
-            else create_face(
-                [mesh_indexes[i + 1], mesh_indexes[i], mesh_indexes[i + 2]]
-            )
-            for i in range(0 , mesh_description.indiciesSize - 2)
-        ]
 
     mesh = bpy.data.meshes.new(mesh_name)
     mesh.validate(verbose=True)
     obj = bpy.data.objects.new(mesh_name, mesh)
-    mesh.from_pydata(vertices_positions, [], mesh_faces)
+    fill_mesh(mesh, vertices_positions, mesh_faces)
 
     # Set up normals
-    # for index, vertex in enumerate(mesh.vertices):
-    #     vertex.normal = mesh_normals[index]
     mesh.normals_split_custom_set_from_vertices(mesh_normals)
 
-    return obj, mesh
+    return obj, mesh, face_sources
+
+
+def fill_mesh(
+    mesh: bpy.types.Mesh, positions: np.ndarray, faces: np.ndarray
+) -> None:
+    """
+    Set the vertices (Nx3) and triangles (Mx3) of an empty mesh through flat
+    buffers, faster than from_pydata for large meshes
+    """
+    mesh.vertices.add(len(positions))
+    mesh.vertices.foreach_set(
+        "co", np.ascontiguousarray(positions, dtype=np.float32).ravel()
+    )
+
+    mesh.loops.add(faces.size)
+    mesh.loops.foreach_set(
+        "vertex_index", np.ascontiguousarray(faces, dtype=np.int32).ravel()
+    )
+
+    mesh.polygons.add(len(faces))
+    mesh.polygons.foreach_set(
+        "loop_start", np.arange(0, faces.size, 3, dtype=np.int32)
+    )
+    # Read-only since 4.0, deduced from the next loop_start
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set(
+            "loop_total", np.full(len(faces), 3, dtype=np.int32)
+        )
+
+    mesh.update(calc_edges=True)
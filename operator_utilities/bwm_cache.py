@@ -0,0 +1,280 @@
+# coding=utf-8
+"""
+Caches of parsed .bwm files, so that importing the same unchanged file
+again doesn't parse it again: in memory for the session and optionally on
+disk across sessions
+"""
+from collections import OrderedDict
+from io import BytesIO
+from typing import Dict, Optional, Tuple
+import hashlib
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from .file_definition_bwm import BWMFile, iter_sections
+
+
+class BWMDiskCache:
+    """
+    Cache of decoded .bwm files on disk keyed by a hash of their content,
+    so that the same file found at another path or with another mtime (a
+    fresh checkout on a build machine) is still a hit. Each entry is a
+    directory holding the metadata of the file and one .npy file per array
+    (vertices, stride data, indexes, cleaves) which are memory mapped when
+    loaded. A side index maps (path, size, mtime) to the hash, so that an
+    unchanged file isn't read again to be hashed. The least recently used
+    entries and index files are removed past budget bytes.
+    """
+
+    # Size an index file is counted for, one disk block
+    INDEX_SIZE = 4096
+
+    def __init__(self, directory: str, budget: int = 2 * 1024 * 1024 * 1024):
+        self.directory = directory
+        self.entries = os.path.join(directory, "entries")
+        self.index = os.path.join(directory, "index")
+        # Entries and index files are written here first then moved in place
+        self.staging = os.path.join(directory, "staging")
+        self.budget = budget
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def load(self, filepath: str) -> BWMFile:
+        """Return the decoded file, from the cache if its content is known"""
+        stat = os.stat(filepath)
+        key = f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}"
+        index = os.path.join(
+            self.index, hashlib.sha1(key.encode("utf-8")).hexdigest()
+        )
+
+        content = None
+        digest = self.read_index(index)
+        if digest is None:
+            with open(filepath, "rb") as reader:
+                content = reader.read()
+            digest = hashlib.sha1(content).hexdigest()
+            self.write_index(index, digest)
+        entry = os.path.join(self.entries, digest)
+
+        bwm = self.read_entry(entry)
+        if bwm is not None:
+            self.hits += 1
+            # Entries are evicted by last use
+            os.utime(entry)
+            if content is not None:
+                self.evict()
+            return bwm
+
+        self.misses += 1
+        if content is None:
+            with open(filepath, "rb") as reader:
+                content = reader.read()
+        bwm = BWMFile(BytesIO(content))
+        self.write_entry(
+            entry, content[: 0x38 + bwm.fileHeader.metadataSize], bwm
+        )
+        self.evict()
+        return bwm
+
+    def read_index(self, index: str) -> Optional[str]:
+        """Hash of the content of the file of the index, None if unknown"""
+        try:
+            with open(index, "r") as reader:
+                digest = reader.read()
+            os.utime(index)
+        except OSError:
+            return None
+        return digest or None
+
+    def write_index(self, index: str, digest: str) -> None:
+        try:
+            os.makedirs(self.index, exist_ok=True)
+            os.makedirs(self.staging, exist_ok=True)
+            handle, staging = tempfile.mkstemp(dir=self.staging)
+            with os.fdopen(handle, "w") as writer:
+                writer.write(digest)
+            os.replace(staging, index)
+        except OSError:
+            pass
+
+    def read_entry(self, entry: str) -> Optional[BWMFile]:
+        try:
+            with open(os.path.join(entry, "metadata.bin"), "rb") as reader:
+                sections = list(iter_sections(reader, metadataOnly=True))
+            bwm = BWMFile()
+            bwm.assignSections(sections)
+            bwm.data = []
+            arrays = [
+                (name, np.load(os.path.join(entry, f"{name}.npy"), "r"))
+                for (name, _, _) in bwm.bulkSections(0)
+            ]
+        except (OSError, ValueError):
+            return None
+        # Cleaves are stored as an array but used as tuples
+        bwm.assignSections(
+            (name, [tuple(c) for c in array.tolist()])
+            if name == "modelCleaves"
+            else (name, array)
+            for (name, array) in arrays
+        )
+        return bwm
+
+    def write_entry(self, entry: str, metadata: bytes, bwm: BWMFile) -> None:
+        """Write the entry aside then move it in place, keeping any other"""
+        os.makedirs(self.entries, exist_ok=True)
+        os.makedirs(self.staging, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.staging)
+        try:
+            with open(os.path.join(staging, "metadata.bin"), "wb") as writer:
+                writer.write(metadata)
+            arrays = {"vertices": bwm.vertexData, "indexes": bwm.indexes}
+            for i, data in enumerate(bwm.data):
+                arrays[f"data[{i}]"] = data
+            if bwm.fileHeader.version > 5:
+                arrays["modelCleaves"] = np.asarray(
+                    bwm.modelCleaves, dtype="<f4"
+                ).reshape(-1, 3)
+            for name, array in arrays.items():
+                np.save(os.path.join(staging, f"{name}.npy"), array)
+            os.rename(staging, entry)
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def evict(self) -> None:
+        """
+        Remove the least recently used entries and index files until budget
+        bytes fit, what is being written in staging is left alone
+        """
+        items = []
+        for directory in (self.entries, self.index):
+            try:
+                names = os.listdir(directory)
+            except OSError:
+                continue
+            for name in names:
+                item = os.path.join(directory, name)
+                try:
+                    if directory == self.entries:
+                        size = sum(
+                            os.path.getsize(os.path.join(item, file))
+                            for file in os.listdir(item)
+                        )
+                    else:
+                        size = self.INDEX_SIZE
+                    items.append((os.path.getmtime(item), size, item))
+                except OSError:
+                    # Removed by another process meanwhile
+                    continue
+        items.sort()
+
+        size = sum(item_size for (_, item_size, _) in items)
+        for (_, item_size, item) in items:
+            if size <= self.budget:
+                break
+            if os.path.dirname(item) == self.entries:
+                shutil.rmtree(item, ignore_errors=True)
+                self.evictions += 1
+            else:
+                try:
+                    os.remove(item)
+                except OSError:
+                    pass
+            size -= item_size
+
+
+class BWMCache:
+    """
+    Least recently used cache of BWMFile keyed by (path, size, mtime), the
+    cached files are shared and must be treated as read-only. The byte
+    budget is compared to the size of the cached files on disk, which is
+    what their decoded arrays take in memory. Misses go through the disk
+    cache when one is given.
+    """
+
+    def __init__(
+        self,
+        budget: int = 512 * 1024 * 1024,
+        disk: Optional[BWMDiskCache] = None,
+    ):
+        self._entries: "OrderedDict[Tuple[str, int, int], BWMFile]"
+        self._entries = OrderedDict()
+        self._budget = budget
+        self.disk = disk
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def budget(self) -> int:
+        return self._budget
+
+    @budget.setter
+    def budget(self, budget: int):
+        self._budget = budget
+        self._evict(0)
+
+    def load(self, filepath: str) -> BWMFile:
+        """Return the parsed file, parsing it only if it isn't cached"""
+        stat = os.stat(filepath)
+        key = (os.path.abspath(filepath), stat.st_size, stat.st_mtime_ns)
+        bwm = self._entries.get(key)
+        if bwm is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return bwm
+
+        self.misses += 1
+        if self.disk:
+            bwm = self.disk.load(filepath)
+        else:
+            with open(filepath, "rb") as reader:
+                bwm = BWMFile(reader)
+        self.store(key, bwm)
+        return bwm
+
+    def store(self, key: Tuple[str, int, int], bwm: BWMFile) -> None:
+        # An older version of the same file won't be asked for again
+        for stale in [k for k in self._entries if k[0] == key[0]]:
+            self._remove(stale)
+        if key[1] > self._budget:
+            return
+        self._evict(key[1])
+        self._entries[key] = bwm
+        self.size += key[1]
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "size": self.size,
+            "budget": self._budget,
+        }
+
+    def _remove(self, key: Tuple[str, int, int]) -> None:
+        del self._entries[key]
+        self.size -= key[1]
+
+    def _evict(self, needed: int) -> None:
+        """Drop the least recently used files until needed bytes fit"""
+        while self._entries and self.size + needed > self._budget:
+            key = next(iter(self._entries))
+            self._remove(key)
+            self.evictions += 1
+
+
+# Shared by every import of the session, BWM_CACHE_DIR enables the disk
+# cache from the environment (build machines)
+parsed_models = BWMCache()
+if os.environ.get("BWM_CACHE_DIR"):
+    parsed_models.disk = BWMDiskCache(os.environ["BWM_CACHE_DIR"])
@@ -0,0 +1,288 @@
+# coding=utf-8
+"""
+Deterministic generator of synthetic .bwm files, for tests and benchmarks
+that can't rely on the game assets.
+
+Each mesh is a ladder of vertices (two rows) so that its triangles are
+exactly the ones of the strip going through its vertices in order, skins
+store that strip and models the triangle list decoded from it.
+
+Run from the root of the repository to write a corpus:
+    python -m operator_utilities.bwm_generator out_dir --files 10
+"""
+
+from typing import List
+import argparse
+import os
+
+import numpy as np
+
+from .file_definition_bwm import (
+    BWMFile,
+    Bone,
+    CollisionPoint,
+    Entity,
+    FileType,
+    MaterialDefinition,
+    MaterialRef,
+    MeshDescription,
+)
+from .strip_utils import strip_to_triangles
+from .stride_utils import create_skin_strides, vertex_stride
+
+
+def ladder_strip(vertex_count: int) -> np.ndarray:
+    """Triangles (N-2)x3 of the strip 0..N-1 over a ladder of vertices"""
+    return strip_to_triangles(np.arange(vertex_count))
+
+
+def describe_bounds(description, positions: np.ndarray) -> None:
+    """Set the bounding box, sphere and height of a mesh description"""
+    box1 = positions.min(axis=0)
+    box2 = positions.max(axis=0)
+    cent = positions.mean(axis=0)
+    description.box1 = [float(v) for v in box1]
+    description.box2 = [float(v) for v in box2]
+    description.cent = [float(v) for v in cent]
+    description.radius = float(np.linalg.norm(positions - cent, axis=1).max())
+    description.unknowns1 = description.box2
+    description.height = description.box2[1]
+    description.bbox_volume = float(np.prod(box2 - box1))
+
+
+def generate_bwm(
+    vertex_count: int = 1000,
+    mesh_count: int = 1,
+    lod_count: int = 1,
+    material_count: int = 1,
+    uv_count: int = 1,
+    skin: bool = False,
+    bone_count: int = 4,
+    version: int = 5,
+    cleave_count: int = 0,
+    entity_count: int = 0,
+    collision_point_count: int = 0,
+    seed: int = 0,
+) -> BWMFile:
+    """
+    Build a valid BWMFile of vertex_count vertices split over mesh_count
+    meshes, the meshes are spread over lod_count LOD levels and their
+    faces over material_count materials. Skins carry bone_count bones and
+    the 8 bone/weight strides, version 6 files carry cleave_count cleaves.
+    The same arguments always give the same file.
+    """
+    if vertex_count > 0x10000:
+        raise ValueError("Indexes are 16 bits, a file has 65536 vertices max")
+    if vertex_count < 3 * mesh_count:
+        raise ValueError("Each mesh needs at least 3 vertices")
+    rng = np.random.default_rng(seed)
+
+    bwm = BWMFile()
+    bwm.fileHeader.version = version
+    bwm.modelHeader.type = FileType.SKIN if skin else FileType.MODEL
+
+    bwm.materialDefinitions = []
+    for i in range(material_count):
+        definition = MaterialDefinition()
+        definition.diffuseMap = f"synthetic_{i}.dds"
+        if i % 2:
+            definition.normalMap = f"synthetic_{i}_normal.dds"
+        bwm.materialDefinitions.append(definition)
+
+    # Meshes: ladders side by side along x, LODs stacked along z
+    sizes = np.full(mesh_count, vertex_count // mesh_count)
+    sizes[: vertex_count % mesh_count] += 1
+    positions = []
+    index_chunks = []
+    index_count = 0
+    vertex_offset = 0
+    bwm.meshDescriptions = []
+    for i, size in enumerate(sizes.tolist()):
+        lod = i % lod_count + 1
+        ladder = np.arange(size)
+        mesh_positions = np.column_stack(
+            [ladder // 2 + i * size, ladder % 2, np.full(size, lod)]
+        ).astype("<f4")
+        mesh_positions += rng.normal(0.0, 0.05, mesh_positions.shape)
+        positions.append(mesh_positions)
+
+        faces = ladder_strip(size)
+        if skin:
+            indexes = ladder + vertex_offset
+        else:
+            indexes = faces.ravel() + vertex_offset
+        index_chunks.append(indexes)
+
+        description = MeshDescription()
+        description.name = f"synthetic_{i}"
+        description.lod_level = lod
+        description.unknown_int = 2 if lod == 1 else 1
+        description.zaxis = (0.0, 0.0, 1.0)
+        description.xaxis = (1.0, 0.0, 0.0)
+        description.yaxis = (0.0, 1.0, 0.0)
+        description.position = [0.0, 0.0, 0.0]
+        # Skins meshes after the first start two indexes before their strip
+        description.indiciesOffset = index_count
+        if skin and index_count > 0:
+            description.indiciesOffset -= 2
+        description.indiciesSize = len(indexes)
+        description.vertexOffset = vertex_offset
+        description.vertexSize = size
+        description.facesCount = len(faces)
+        describe_bounds(description, mesh_positions)
+
+        face_bounds = np.linspace(0, len(faces), material_count + 1)
+        face_bounds = face_bounds.astype(int).tolist()
+        for j in range(material_count):
+            faces_size = face_bounds[j + 1] - face_bounds[j]
+            if faces_size == 0:
+                continue
+            reference = MaterialRef()
+            reference.materialDefinition = (i + j) % material_count
+            reference.facesOffset = face_bounds[j]
+            reference.facesSize = faces_size
+            reference.vertexOffset = vertex_offset
+            reference.vertexSize = size
+            if skin:
+                reference.indiciesOffset = index_count + face_bounds[j]
+                reference.indiciesSize = faces_size
+            else:
+                reference.indiciesOffset = index_count + 3 * face_bounds[j]
+                reference.indiciesSize = 3 * faces_size
+            description.materialRefs.append(reference)
+        description.materialRefsCount = len(description.materialRefs)
+
+        bwm.meshDescriptions.append(description)
+        index_count += len(indexes)
+        vertex_offset += size
+
+    positions = np.concatenate(positions)
+    normals = rng.normal(0.0, 1.0, positions.shape)
+    normals /= np.linalg.norm(normals, axis=1, keepdims=True)
+    uvs = [rng.random((vertex_count, 2)) for _ in range(uv_count)]
+    bwm.strides = [vertex_stride(True, uv_count)]
+    bwm.vertexData = bwm.strides[0].interleave(
+        [positions, normals, *uvs], vertex_count
+    )
+    bwm.indexes = np.concatenate(index_chunks).astype("<u2")
+
+    if skin:
+        bwm.bones = []
+        for i in range(bone_count):
+            bone = Bone(count=i)
+            bone.zaxis = (0.0, 0.0, 1.0)
+            bone.xaxis = (1.0, 0.0, 0.0)
+            bone.yaxis = (0.0, 1.0, 0.0)
+            bone.position = tuple(rng.random(3).tolist())
+            bwm.bones.append(bone)
+        bwm.strides.extend(create_skin_strides())
+        bone_indexes = rng.integers(0, max(bone_count, 1), (4, vertex_count))
+        weights = rng.random((4, vertex_count))
+        weights /= weights.sum(axis=0)
+        columns = list(bone_indexes) + list(weights)
+        bwm.data = [
+            stride.interleave([column], vertex_count)
+            for stride, column in zip(bwm.strides[1:], columns)
+        ]
+
+    for i in range(entity_count):
+        entity = Entity()
+        entity.zaxis = (0.0, 0.0, 1.0)
+        entity.xaxis = (1.0, 0.0, 0.0)
+        entity.yaxis = (0.0, 1.0, 0.0)
+        entity.position = tuple(rng.random(3).tolist())
+        entity.name = f"synthetic_entity_{i}"
+        bwm.entities.append(entity)
+
+    for _ in range(collision_point_count):
+        point = CollisionPoint()
+        point.position = tuple(rng.random(3).tolist())
+        bwm.collisionPoints.append(point)
+
+    if version > 5:
+        bwm.modelCleaves = [
+            tuple(cleave) for cleave in rng.random((cleave_count, 3)).tolist()
+        ]
+
+    first = bwm.meshDescriptions[0]
+    header = bwm.modelHeader
+    header.box1 = tuple(first.box1)
+    header.box2 = tuple(first.box2)
+    header.cent = tuple(first.cent)
+    header.pnt = header.box2
+    header.volume = first.bbox_volume
+    header.height = first.height
+    header.radius = first.radius
+    header.materialDefinitionCount = len(bwm.materialDefinitions)
+    header.meshDescriptionCount = len(bwm.meshDescriptions)
+    header.boneCount = len(bwm.bones)
+    header.entityCount = len(bwm.entities)
+    header.unknownCount1 = len(bwm.unknowns1)
+    header.collisionPointCount = len(bwm.collisionPoints)
+    header.vertexCount = vertex_count
+    header.strideCount = len(bwm.strides)
+    header.indexCount = len(bwm.indexes)
+    header.modelCleaveCount = len(bwm.modelCleaves)
+
+    return bwm
+
+
+def write_corpus(directory: str, files: int, **options) -> List[str]:
+    """
+    Write files synthetic .bwm into directory, the n-th one generated with
+    the seed option plus n, and return their paths
+    """
+    seed = options.pop("seed", 0)
+    paths = []
+    for i in range(files):
+        filepath = os.path.join(directory, f"synthetic_{i:04d}.bwm")
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        generate_bwm(seed=seed + i, **options).write(filepath)
+        paths.append(filepath)
+    return paths
+
+
+def main(args: List[str] = None):
+    parser = argparse.ArgumentParser(
+        description="Write a deterministic corpus of synthetic .bwm files"
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--files", type=int, default=1)
+    parser.add_argument("--vertices", type=int, default=1000)
+    parser.add_argument("--meshes", type=int, default=1)
+    parser.add_argument("--lods", type=int, default=1)
+    parser.add_argument("--materials", type=int, default=1)
+    parser.add_argument("--uvs", type=int, default=1)
+    parser.add_argument("--skin", action="store_true")
+    parser.add_argument("--bones", type=int, default=4)
+    parser.add_argument("--version", type=int, choices=(5, 6), default=5)
+    parser.add_argument("--cleaves", type=int, default=0)
+    parser.add_argument("--entities", type=int, default=0)
+    parser.add_argument("--collision-points", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    options = parser.parse_args(args)
+
+    os.makedirs(options.directory, exist_ok=True)
+    paths = write_corpus(
+        options.directory,
+        options.files,
+        vertex_count=options.vertices,
+        mesh_count=options.meshes,
+        lod_count=options.lods,
+        material_count=options.materials,
+        uv_count=options.uvs,
+        skin=options.skin,
+        bone_count=options.bones,
+        version=options.version,
+        cleave_count=options.cleaves,
+        entity_count=options.entities,
+        collision_point_count=options.collision_points,
+        seed=options.seed,
+    )
+    for filepath in paths:
+        print(filepath)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# coding=utf-8
+"""
+Check that every .bwm file of a directory is written back as an exact copy
+of itself, the files are parsed and written in parallel.
+
+Run from the root of the repository:
+    python -m operator_utilities.bwm_verify path/to/game/Data --jobs 8
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from struct import error as struct_error
+from typing import Dict, List, Optional
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from .file_definition_bwm import (
+    BWMFile,
+    Bone,
+    CollisionPoint,
+    Entity,
+    MaterialDefinition,
+    MaterialRef,
+    MeshDescription,
+    Stride,
+    Unknown1,
+)
+from .path_utils import find_bwm_files
+
+RECORD_SIZES = {
+    "materialDefinitions": MaterialDefinition.codec.size,
+    "meshDescriptions": MeshDescription.codec.size,
+    "materialRefs": MaterialRef.codec.size,
+    "bones": Bone.codec.size,
+    "entities": Entity.codec.size,
+    "unknowns1": Unknown1.codec.size,
+    "collisionPoints": CollisionPoint.codec.size,
+    "strides": Stride.codec.size,
+    "indexes": 2,
+}
+
+
+def first_mismatch(original: bytes, written: bytes) -> Optional[int]:
+    """Offset of the first differing byte, None for identical content"""
+    if original == written:
+        return None
+    size = min(len(original), len(written))
+    differences = np.flatnonzero(
+        np.frombuffer(original, dtype="u1", count=size)
+        != np.frombuffer(written, dtype="u1", count=size)
+    )
+    if len(differences):
+        return int(differences[0])
+    return size
+
+
+def locate(bwm: BWMFile, offset: int) -> str:
+    """Name of the section, and element within it, containing offset"""
+    for name, start, size in bwm.sections():
+        if start <= offset < start + size:
+            if name == "vertices":
+                return f"vertices[{(offset - start) // bwm.strides[0].stride}]"
+            if name in RECORD_SIZES:
+                return f"{name}[{(offset - start) // RECORD_SIZES[name]}]"
+            return name
+    return "past the end of the file"
+
+
+def verify_file(filepath: str) -> Dict:
+    """Parse and write back a file, reporting timings and the first mismatch"""
+    result = {"path": filepath, "status": "same"}
+    with open(filepath, "rb") as reader:
+        original = reader.read()
+        reader.seek(0)
+        start = time.perf_counter()
+        try:
+            bwm = BWMFile(reader)
+        except (ValueError, struct_error) as e:
+            result["status"] = "unreadable"
+            result["error"] = str(e)
+            return result
+    result["parse_s"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    try:
+        written = bwm.pack()
+    except (ValueError, TypeError, struct_error) as e:
+        result["status"] = "unwritable"
+        result["error"] = str(e)
+        return result
+    result["write_s"] = time.perf_counter() - start
+
+    offset = first_mismatch(original, written)
+    if offset is not None:
+        result["status"] = "different"
+        result["offset"] = offset
+        result["section"] = locate(bwm, offset)
+    return result
+
+
+def verify_files(paths: List[str], jobs: Optional[int] = None) -> List[Dict]:
+    with ProcessPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(verify_file, paths, chunksize=4))
+
+
+def describe(result: Dict) -> str:
+    status = result["status"]
+    if status in ("unreadable", "unwritable"):
+        return f"{status}: {result['error']}"
+    timings = (
+        f"parse {result['parse_s'] * 1000:.2f} ms,"
+        f" write {result['write_s'] * 1000:.2f} ms"
+    )
+    if status == "different":
+        return (
+            f"different from 0x{result['offset']:X}"
+            f" in {result['section']} ({timings})"
+        )
+    return f"same ({timings})"
+
+
+def main(args: List[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Check that .bwm files are written back unchanged"
+    )
+    parser.add_argument("directory")
+    parser.add_argument(
+        "-j", "--jobs", type=int, help="Worker processes, one per CPU if unset"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the results as JSON"
+    )
+    options = parser.parse_args(args)
+
+    paths = find_bwm_files(options.directory)
+    start = time.perf_counter()
+    results = verify_files(paths, options.jobs)
+    elapsed = time.perf_counter() - start
+
+    counts: Dict[str, int] = {}
+    for result in results:
+        counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    if options.json:
+        print(json.dumps({"elapsed_s": elapsed, "results": results}, indent=2))
+    else:
+        for result in results:
+            relative = os.path.relpath(result["path"], options.directory)
+            print(f"{relative}: {describe(result)}")
+        summary = ", ".join(f"{n} {status}" for status, n in counts.items())
+        print(f"{len(results)} files in {elapsed:.2f} s: {summary or 'none'}")
+
+    return 0 if counts.get("same", 0) == len(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,12 @@
 # coding=utf-8
 """ Structures of a .bwm with associated IO """
 from io import BufferedReader, BufferedWriter
-from typing import List
-from glob import glob
+from typing import Any, Iterable, Iterator, List, Tuple
 from enum import Enum
 import struct
+import numpy as np
 
-if __name__ != "__main__":
-    from .file_definition_utilities import *
-else:
-    from file_definition_utilities import *
-    from colorama import Fore, Style
-    import filecmp
-    import json
-    import os
+from .file_definition_utilities import *
 
 
 # Section for enumated type
@@ -37,6 +30,17 @@ class StrideType(Enum):
     BONE_INDEX = 6
     BONE_WEIGHT = 7
 
+    @classmethod
+    def _missing_(cls, value):
+        # Ids this plugin doesn't know about are kept as pseudo members so
+        # their data can still be read and written back untouched
+        if not isinstance(value, int) or value < 0:
+            return None
+        member = object.__new__(cls)
+        member._name_ = f"UNKNOWN_{value}"
+        member._value_ = value
+        return cls._value2member_map_.setdefault(value, member)
+
 
 class UVType(Enum):
     UV_TEXTURE = 0
@@ -49,59 +53,220 @@ class BWMFile:
 
     """
     '  Initialisize the data of a BWMFile
+    '  With lazy set the file is memory mapped and only the metadata is
+    '  parsed, vertices, stride data and indexes are decoded from the
+    '  mapping the first time they are accessed
     """
 
-    def __init__(self, reader: BufferedReader = None):
-        self.fileHeader = BWMHeader(reader)
-        self.modelHeader = LionheadModelHeader(reader)
-        self.materialDefinitions = [
-            MaterialDefinition(reader)
-            for _ in range(self.modelHeader.materialDefinitionCount)
-        ]
-        self.meshDescriptions = [
-            MeshDescription(reader)
-            for _ in range(self.modelHeader.meshDescriptionCount)
-        ]
-        for mesh in self.meshDescriptions:
-            mesh.materialRefs = [
-                MaterialRef(reader) for _ in range(mesh.materialRefsCount)
+    def __init__(self, reader: BufferedReader = None, lazy: bool = False):
+        self._vertices = None
+        self._vertexData = None
+        self._data = None
+        self._indexes = None
+        self._source = None
+        self.modelCleaves = []
+        if not reader:
+            self.fileHeader = BWMHeader()
+            self.modelHeader = LionheadModelHeader()
+            self.materialDefinitions = [MaterialDefinition()]
+            self.meshDescriptions = [MeshDescription()]
+            self.meshDescriptions[0].materialRefs = [MaterialRef()]
+            self.bones = []
+            self.entities = []
+            self.unknowns1 = []
+            self.collisionPoints = []
+            self.strides = [Stride()]
+            self._vertexData = np.zeros(0, dtype=self.strides[0].dtype())
+            self._data = []
+            self._indexes = np.zeros(0, dtype="<u2")
+            return
+
+        # The whole vertex block is decoded at once, the per vertex objects
+        # are only built if something asks for them
+        if not lazy:
+            self._data = []
+        self.assignSections(iter_sections(reader, metadataOnly=lazy))
+
+        if lazy:
+            # 0x38 + metadataSize = vertexPointer
+            self._source = map_reader(reader)
+            self._sourceSections = {
+                name: (offset, size)
+                for (name, offset, size) in self.bulkSections(
+                    0x38 + self.fileHeader.metadataSize
+                )
+            }
+            if self.fileHeader.version > 5:
+                offset, _ = self._sourceSections["modelCleaves"]
+                self.modelHeader.modelCleaveCount = int.from_bytes(
+                    self._source[offset : offset + 4], "little"
+                )
+                self.modelCleaves = list(
+                    struct.iter_unpack(
+                        "<fff",
+                        self._source[
+                            offset + 4 : offset
+                            + 4
+                            + 0xC * self.modelHeader.modelCleaveCount
+                        ],
+                    )
+                )
+
+        return
+
+    def assignSections(self, sections: Iterable[Tuple[str, Any]]):
+        """
+        Set the content of the file from (name, content) pairs as yielded
+        by iter_sections, stride data is appended in order
+        """
+        for (name, value) in sections:
+            if name == "vertices":
+                self.vertexData = value
+            elif name.startswith("data["):
+                self._data.append(value)
+            elif name == "indexes":
+                self._indexes = value
+            elif name == "modelCleaves":
+                self.modelCleaves = value
+                self.modelHeader.modelCleaveCount = len(value)
+            else:
+                setattr(self, name, value)
+
+    def __getstate__(self) -> dict:
+        # A memory mapping can't be pickled, a lazy file is pickled with its
+        # metadata only (as returned by worker processes)
+        state = self.__dict__.copy()
+        if self._source is not None:
+            state.update(
+                _source=None,
+                _vertices=None,
+                _vertexData=None,
+                _data=None,
+                _indexes=None,
+            )
+        return state
+
+    def _mapped(self, name: str) -> memoryview:
+        """Slice of the memory mapped file holding a bulk section"""
+        if self._source is None:
+            raise ValueError("The bulk sections of the file weren't pickled")
+        offset, size = self._sourceSections[name]
+        return memoryview(self._source)[offset : offset + size]
+
+    @property
+    def vertexData(self) -> np.ndarray:
+        """Vertex block as a structured array following strides[0]"""
+        if self._vertexData is None:
+            self._vertexData = np.frombuffer(
+                self._mapped("vertices"), dtype=self.strides[0].dtype()
+            )
+        return self._vertexData
+
+    @vertexData.setter
+    def vertexData(self, vertexData: np.ndarray):
+        self._vertexData = vertexData
+        self._vertices = None
+
+    @property
+    def data(self) -> List[np.ndarray]:
+        """
+        Data of every stride but the first one, one structured array per
+        stride following its dtype
+        """
+        if self._data is None:
+            self._data = [
+                np.frombuffer(self._mapped(f"data[{i}]"), dtype=stride.dtype())
+                for i, stride in enumerate(self.strides[1:])
             ]
-        self.bones = [Bone(reader, i) for i in range(self.modelHeader.boneCount)]
-        self.entities = [
-            Entity(reader) for _ in range(self.modelHeader.entityCount)
-        ]
-        self.unknowns1 = [
-            Unknown1(reader) for _ in range(self.modelHeader.unknownCount1)
-        ]
-        self.collisionPoints = [
-            CollisionPoint(reader)
-            for _ in range(self.modelHeader.collisionPointCount)
-        ]
-        self.strides = [
-            Stride(reader) for _ in range(self.modelHeader.strideCount)
-        ]
-        self.vertices = [
-            Vertex(self.strides[0], reader)
-            for _ in range(self.modelHeader.vertexCount)
-        ]
-        self.data = [
-            [
-                stride.read_data(reader)
-                for _ in range(self.modelHeader.vertexCount)
+        return self._data
+
+    @data.setter
+    def data(self, data: List[np.ndarray]):
+        self._data = data
+
+    @property
+    def indexes(self) -> np.ndarray:
+        """Index buffer as an array of uint16"""
+        if self._indexes is None:
+            self._indexes = np.frombuffer(self._mapped("indexes"), dtype="<u2")
+        return self._indexes
+
+    @indexes.setter
+    def indexes(self, indexes: np.ndarray):
+        self._indexes = indexes
+
+    @property
+    def vertices(self) -> List["Vertex"]:
+        """
+        Compatibility view of vertexData as a list of Vertex,
+        built on first access
+        """
+        if self._vertices is None:
+            stride = self.strides[0]
+            columns = [
+                self.vertexData[name].tolist()
+                for name in self.vertexData.dtype.names
             ]
-            for stride in self.strides[1:]
-        ]
-        self.indexes = [
-            read_int16(reader) for i in range(self.modelHeader.indexCount)
+            self._vertices = [
+                Vertex.from_values(stride, values) for values in zip(*columns)
+            ]
+        return self._vertices
+
+    @vertices.setter
+    def vertices(self, vertices: List["Vertex"]):
+        self._vertices = vertices
+
+    def sections(self) -> List[Tuple[str, int, int]]:
+        """Name, offset and size of every section of the file in order"""
+        materialRefs = [
+            materialRef
+            for meshDescription in self.meshDescriptions
+            for materialRef in meshDescription.materialRefs
         ]
+        sections = []
+        offset = 0
+        for (name, records) in (
+            ("fileHeader", [self.fileHeader]),
+            ("modelHeader", [self.modelHeader]),
+            ("materialDefinitions", self.materialDefinitions),
+            ("meshDescriptions", self.meshDescriptions),
+            ("materialRefs", materialRefs),
+            ("bones", self.bones),
+            ("entities", self.entities),
+            ("unknowns1", self.unknowns1),
+            ("collisionPoints", self.collisionPoints),
+            ("strides", self.strides),
+        ):
+            size = sum(record.codec.size for record in records)
+            sections.append((name, offset, size))
+            offset += size
+        sections.extend(self.bulkSections(offset))
+
+        return sections
+
+    def bulkSections(self, vertexPointer: int) -> List[Tuple[str, int, int]]:
+        """
+        Name, offset and size of the sections following the metadata,
+        starting from the vertex block
+        """
+        sections = []
+        offset = vertexPointer
+        vertexCount = self.modelHeader.vertexCount
+        size = self.strides[0].stride * vertexCount
+        sections.append(("vertices", offset, size))
+        offset += size
+        for i, stride in enumerate(self.strides[1:]):
+            size = stride.stride * vertexCount
+            sections.append((f"data[{i}]", offset, size))
+            offset += size
+        size = 2 * self.modelHeader.indexCount
+        sections.append(("indexes", offset, size))
+        offset += size
         if self.fileHeader.version > 5:
-            self.modelHeader.modelCleaveCount = read_int32(reader)
-            self.modelCleaves = [
-                (read_float(reader), read_float(reader), read_float(reader))
-                for _ in range(self.modelHeader.modelCleaveCount)
-            ]
+            size = 4 + 0xC * self.modelHeader.modelCleaveCount
+            sections.append(("modelCleaves", offset, size))
 
-        return
+        return sections
 
     def metadataSize(self):
         size = 0x80
@@ -129,72 +294,186 @@ class BWMFile:
 
         return size
 
+    def vertexBlock(self) -> np.ndarray:
+        """
+        Vertex block as a structured array, packed from the Vertex list
+        when it has been built and may have been modified
+        """
+        if self._vertices is None:
+            return self.vertexData
+        stride = self.strides[0]
+        columns = zip(*(vertex.values(stride) for vertex in self._vertices))
+        return stride.interleave(
+            [np.array(column, dtype="<f4") for column in columns],
+            len(self._vertices),
+        )
+
+    def records(self) -> List[Record]:
+        """Every fixed size record of the file in writing order"""
+        records = [self.fileHeader, self.modelHeader]
+        records.extend(self.materialDefinitions)
+        # self.meshDescriptions.sort(key = lambda x: x.id)
+        records.extend(self.meshDescriptions)
+        for meshDescription in self.meshDescriptions:
+            records.extend(meshDescription.materialRefs)
+        records.extend(self.bones)
+        records.extend(self.entities)
+        records.extend(self.unknowns1)
+        records.extend(self.collisionPoints)
+        records.extend(self.strides)
+
+        return records
+
+    def pack(self) -> bytearray:
+        """
+        Serialize the whole file into a single buffer preallocated
+        from size()
+        """
+        self.fileHeader.size = self.size()
+        self.fileHeader.metadataSize = self.metadataSize()
+        # size doesn't account for the identifier and the size itself
+        buffer = bytearray(0x2C + self.fileHeader.size)
+
+        offset = 0
+        for record in self.records():
+            record.pack_into(buffer, offset)
+            offset += record.codec.size
+
+        bulk = [self.vertexBlock()]
+        for (stride, data) in zip(self.strides[1:], self.data):
+            bulk.append(np.asarray(data, dtype=stride.dtype()))
+        bulk.append(np.asarray(self.indexes, dtype="<u2"))
+        if self.fileHeader.version > 5:
+            bulk.append(
+                np.array([self.modelHeader.modelCleaveCount], dtype="<u4")
+            )
+            bulk.append(np.asarray(self.modelCleaves, dtype="<f4"))
+        for array in bulk:
+            # Typed view over the output, the data is copied only once and
+            # a size mismatch fails instead of resizing the buffer
+            target = np.ndarray(
+                array.shape, dtype=array.dtype, buffer=buffer, offset=offset
+            )
+            target[...] = array
+            offset += array.nbytes
+        if offset != len(buffer):
+            raise ValueError("Counts in the header don't match the data")
+
+        return buffer
+
     def write(self, filepath: str):
         with open(filepath, "xb") as writer:
-            self.fileHeader.size = self.size()
-            self.fileHeader.metadataSize = self.metadataSize()
-            self.fileHeader.write(writer)
-            self.modelHeader.write(writer)
-            for materialDefinition in self.materialDefinitions:
-                materialDefinition.write(writer)
-            materialRefs = []
-            # self.meshDescriptions.sort(key = lambda x: x.id)
-            for meshDescription in self.meshDescriptions:
-                meshDescription.write(writer)
-                materialRefs.extend(meshDescription.materialRefs)
-            for materialRef in materialRefs:
-                materialRef.write(writer)
-            for bone in self.bones:
-                bone.write(writer)
-            for entity in self.entities:
-                entity.write(writer)
-            for unknown1 in self.unknowns1:
-                unknown1.write(writer)
-            for collisionPoint in self.collisionPoints:
-                collisionPoint.write(writer)
-            for stride in self.strides:
-                stride.write(writer)
-            for vertex in self.vertices:
-                vertex.write(writer)
-            for (stride, data) in zip(self.strides[1:], self.data):
-                stride.write_data(writer, data)
-            # for data in self.data:
-            #    writer.write(data)
-            for indice in self.indexes:
-                write_int16(writer, indice)
-            if self.fileHeader.version > 5:
-                write_int32(writer, self.modelHeader.modelCleaveCount)
-                for modelCleave in self.modelCleaves:
-                    write_vector(writer, modelCleave, write_float)
+            writer.write(self.pack())
+
+
+def iter_sections(
+    reader: BufferedReader, metadataOnly: bool = False
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Decode a .bwm file one section at a time, yielding the name of each
+    section with its content as soon as it's read: records for the
+    metadata, structured arrays for vertices and stride data, an uint16
+    array for indexes. Names are those of BWMFile.sections, except that
+    there is no materialRefs section: mesh descriptions come with their
+    material refs. With metadataOnly set it stops after the strides.
+    """
+    fileHeader = BWMHeader(reader)
+    yield ("fileHeader", fileHeader)
+    modelHeader = LionheadModelHeader(reader)
+    yield ("modelHeader", modelHeader)
+    yield (
+        "materialDefinitions",
+        MaterialDefinition.read_records(
+            reader, modelHeader.materialDefinitionCount
+        ),
+    )
+    meshDescriptions = MeshDescription.read_records(
+        reader, modelHeader.meshDescriptionCount
+    )
+    for mesh in meshDescriptions:
+        mesh.materialRefs = MaterialRef.read_records(
+            reader, mesh.materialRefsCount
+        )
+    yield ("meshDescriptions", meshDescriptions)
+    bones = Bone.read_records(reader, modelHeader.boneCount)
+    for i, bone in enumerate(bones):
+        bone.name = str(i)
+    yield ("bones", bones)
+    yield ("entities", Entity.read_records(reader, modelHeader.entityCount))
+    yield (
+        "unknowns1",
+        Unknown1.read_records(reader, modelHeader.unknownCount1),
+    )
+    yield (
+        "collisionPoints",
+        CollisionPoint.read_records(reader, modelHeader.collisionPointCount),
+    )
+    strides = Stride.read_records(reader, modelHeader.strideCount)
+    yield ("strides", strides)
+    if metadataOnly:
+        return
+
+    yield (
+        "vertices",
+        read_array(reader, strides[0].dtype(), modelHeader.vertexCount),
+    )
+    for i, stride in enumerate(strides[1:]):
+        yield (
+            f"data[{i}]",
+            read_array(reader, stride.dtype(), modelHeader.vertexCount),
+        )
+    yield ("indexes", read_array(reader, "<u2", modelHeader.indexCount))
+    if fileHeader.version > 5:
+        modelHeader.modelCleaveCount = read_int32(reader)
+        yield (
+            "modelCleaves",
+            list(
+                struct.iter_unpack(
+                    "<fff", reader.read(0xC * modelHeader.modelCleaveCount)
+                )
+            ),
+        )
+
+
+class BWMSummary:
+
+    """
+    '  Headers, material definitions and mesh descriptions of a BWMFile,
+    '  enough to know what a file contains without reading its geometry
+    """
+
+    def __init__(self, reader: BufferedReader = None):
+        self.fileHeader = BWMHeader(reader)
+        self.modelHeader = LionheadModelHeader(reader)
+        self.materialDefinitions = MaterialDefinition.read_records(
+            reader, self.modelHeader.materialDefinitionCount
+        )
+        self.meshDescriptions = MeshDescription.read_records(
+            reader, self.modelHeader.meshDescriptionCount
+        )
+
+
+def read_summary(filepath: str) -> BWMSummary:
+    """
+    Read the summary of a .bwm file, stopping before the material
+    references so that neither strides, vertices nor indexes are read
+    """
+    with open(filepath, "rb") as reader:
+        return BWMSummary(reader)
 
 
-class BWMHeader:
+class BWMHeader(Record):
     """
     '  Header for BWM files, contains identifier for the format
     '  and information on format version and file size
     '  Size :   0x38
     """
 
+    codec = struct.Struct("<40s4I")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.fileIdentifier = (
-                (reader.read(40)).decode().replace("\0", "")
-            )  # 0x00
-            if "LiOnHeAdMODEL" not in self.fileIdentifier:
-                raise ValueError(
-                    "This is not a valid .bwm file (magic string mismatch)."
-                )
-            self.size = read_int32(reader)  # 0x28
-            self.numberIdentifier = read_int32(reader)  # 0x2C
-            if self.numberIdentifier != 0x2B00B1E5:
-                raise ValueError(
-                    "This is not a valid .bwm file (magic number mismatch)."
-                )
-            self.version = read_int32(reader)  # 0x30
-            if self.version < 5:
-                raise ValueError("Unsupported version of the format")
-            self.metadataSize = read_int32(reader)  # 0x34
-            # 0x38 + metadataSize = vertexPointer
+            self.read(reader)
             return
         else:
             self.fileIdentifier = "LiOnHeAdMODEL"
@@ -203,52 +482,46 @@ class BWMHeader:
             self.version = 5
             self.metadataSize = 0
 
-    def write(self, writer: BufferedWriter = None):
-        if writer:
-            write_str(writer, self.fileIdentifier, 40)
-            write_int32(writer, self.size)
-            write_int32(writer, 0x2B00B1E5)
-            write_int32(writer, self.version)
-            write_int32(writer, self.metadataSize)
-
-
-class LionheadModelHeader:
+    def assign(self, values: Tuple):
+        self.fileIdentifier = unpack_str(values[0])  # 0x00
+        if "LiOnHeAdMODEL" not in self.fileIdentifier:
+            raise ValueError(
+                "This is not a valid .bwm file (magic string mismatch)."
+            )
+        self.size = values[1]  # 0x28
+        self.numberIdentifier = values[2]  # 0x2C
+        if self.numberIdentifier != 0x2B00B1E5:
+            raise ValueError(
+                "This is not a valid .bwm file (magic number mismatch)."
+            )
+        self.version = values[3]  # 0x30
+        if self.version < 5:
+            raise ValueError("Unsupported version of the format")
+        self.metadataSize = values[4]  # 0x34
+        # 0x38 + metadataSize = vertexPointer
+
+    def values(self) -> Tuple:
+        return (
+            pack_str(self.fileIdentifier),
+            self.size,
+            0x2B00B1E5,
+            self.version,
+            self.metadataSize,
+        )
+
+
+class LionheadModelHeader(Record):
     """
     '  Part of the Header summarizing information about the model
     '  described by the file
     '  Size :   0x80
     """
 
+    codec = struct.Struct("<15fIf6I5f4I")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.unknown1 = read_float(reader)
-            self.pnt = tuple(read_float(reader) for i in range(3))
-            self.box1 = tuple(read_float(reader) for i in range(3))
-            self.box2 = tuple(read_float(reader) for i in range(3))
-            self.cent = tuple(read_float(reader) for i in range(3))
-            self.height = read_float(reader)
-            # Snappin related value (maybe distance)
-            self.radius = read_float(reader)
-            self.unknown2 = read_int32(reader)
-            self.volume = read_float(reader)
-
-            self.materialDefinitionCount = read_int32(reader)  # 0x7C
-            self.meshDescriptionCount = read_int32(reader)  # 0X80
-            self.boneCount = read_int32(reader)  # 0x84
-            self.entityCount = read_int32(reader)  # 0x88
-            self.unknownCount1 = read_int32(reader)  # 0x8C
-            self.collisionPointCount = read_int32(reader)  # 0x90
-
-            self.unknown3 = read_float(reader)
-            self.unknowns2 = tuple(read_float(reader) for i in range(3))
-            self.unknown4 = read_float(reader)
-
-            self.vertexCount = read_int32(reader)  # 0xA8
-            self.strideCount = read_int32(reader)  # 0xAC
-            # 0xB0 Three for skins and two for the rest
-            self.type = FileType(read_int32(reader))
-            self.indexCount = read_int32(reader)  # 0xB4
-            self.modelCleaveCount = 0
+            self.read(reader)
             return
         else:
             self.unknown1 = 0.0
@@ -278,48 +551,73 @@ class LionheadModelHeader:
             self.indexCount = 0
             self.modelCleaveCount = 0
 
-    def write(self, writer: BufferedWriter):
-        write_float(writer, self.unknown1)
-        write_vector(writer, self.pnt, write_float)
-        write_vector(writer, self.box1, write_float)
-        write_vector(writer, self.box2, write_float)
-        write_vector(writer, self.cent, write_float)
-        write_float(writer, self.height)
-        write_float(writer, self.radius)
-        write_int32(writer, self.unknown2)
-        write_float(writer, self.volume)
-
-        write_int32(writer, self.materialDefinitionCount)
-        write_int32(writer, self.meshDescriptionCount)
-        write_int32(writer, self.boneCount)
-        write_int32(writer, self.entityCount)
-        write_int32(writer, self.unknownCount1)
-        write_int32(writer, self.collisionPointCount)
-
-        write_float(writer, self.unknown3)
-        write_vector(writer, self.unknowns2, write_float)
-        write_float(writer, self.unknown4)
-
-        write_int32(writer, self.vertexCount)
-        write_int32(writer, self.strideCount)
-        write_int32(writer, self.type.value)
-        write_int32(writer, self.indexCount)
-
-
-class MaterialDefinition:
+    def assign(self, values: Tuple):
+        self.unknown1 = values[0]
+        self.pnt = values[1:4]
+        self.box1 = values[4:7]
+        self.box2 = values[7:10]
+        self.cent = values[10:13]
+        self.height = values[13]
+        # Snappin related value (maybe distance)
+        self.radius = values[14]
+        self.unknown2 = values[15]
+        self.volume = values[16]
+
+        self.materialDefinitionCount = values[17]  # 0x7C
+        self.meshDescriptionCount = values[18]  # 0X80
+        self.boneCount = values[19]  # 0x84
+        self.entityCount = values[20]  # 0x88
+        self.unknownCount1 = values[21]  # 0x8C
+        self.collisionPointCount = values[22]  # 0x90
+
+        self.unknown3 = values[23]
+        self.unknowns2 = values[24:27]
+        self.unknown4 = values[27]
+
+        self.vertexCount = values[28]  # 0xA8
+        self.strideCount = values[29]  # 0xAC
+        # 0xB0 Three for skins and two for the rest
+        self.type = FileType(values[30])
+        self.indexCount = values[31]  # 0xB4
+        self.modelCleaveCount = 0
+
+    def values(self) -> Tuple:
+        return (
+            self.unknown1,
+            *self.pnt,
+            *self.box1,
+            *self.box2,
+            *self.cent,
+            self.height,
+            self.radius,
+            self.unknown2,
+            self.volume,
+            self.materialDefinitionCount,
+            self.meshDescriptionCount,
+            self.boneCount,
+            self.entityCount,
+            self.unknownCount1,
+            self.collisionPointCount,
+            self.unknown3,
+            *self.unknowns2,
+            self.unknown4,
+            self.vertexCount,
+            self.strideCount,
+            self.type.value,
+            self.indexCount,
+        )
+
+
+class MaterialDefinition(Record):
     """
     '  Size    :   0x1C0
     """
 
+    codec = struct.Struct("<" + "64s" * 7)
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.diffuseMap = reader.read(64).decode().replace("\0", "")
-            self.lightMap = reader.read(64).decode().replace("\0", "")
-            self.growthMap = reader.read(64).decode().replace("\0", "")
-            self.specularMap = reader.read(64).decode().replace("\0", "")
-            self.animatedTexture = reader.read(64).decode().replace("\0", "")
-            self.normalMap = reader.read(64).decode().replace("\0", "")
-            self.type = reader.read(64).decode().replace("\0", "")
+            self.read(reader)
             return
         else:
             self.diffuseMap = ""
@@ -330,50 +628,42 @@ class MaterialDefinition:
             self.normalMap = ""
             self.type = ""
 
-    def write(self, writer: BufferedWriter):
-        write_str(writer, self.diffuseMap, 64)
-        write_str(writer, self.lightMap, 64)
-        write_str(writer, self.growthMap, 64)
-        write_str(writer, self.specularMap, 64)
-        write_str(writer, self.animatedTexture, 64)
-        write_str(writer, self.normalMap, 64)
-        write_str(writer, self.type, 64)
+    def assign(self, values: Tuple):
+        (
+            self.diffuseMap,
+            self.lightMap,
+            self.growthMap,
+            self.specularMap,
+            self.animatedTexture,
+            self.normalMap,
+            self.type,
+        ) = (unpack_str(value) for value in values)
+
+    def values(self) -> Tuple:
+        return tuple(
+            pack_str(value)
+            for value in (
+                self.diffuseMap,
+                self.lightMap,
+                self.growthMap,
+                self.specularMap,
+                self.animatedTexture,
+                self.normalMap,
+                self.type,
+            )
+        )
 
 
-class MeshDescription:
+class MeshDescription(Record):
     """
     '  Size    :   0xDC
     """
 
+    codec = struct.Struct("<5I27fIf3I64s2I")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.facesCount = read_int32(reader)
-            self.indiciesOffset = read_int32(reader)
-            self.indiciesSize = read_int32(reader)
-            self.vertexOffset = read_int32(reader)
-            self.vertexSize = read_int32(reader)
-
-            self.zaxis = struct.unpack("<fff", reader.read(12))
-            self.xaxis = struct.unpack("<fff", reader.read(12))
-            self.yaxis = struct.unpack("<fff", reader.read(12))
-            self.position = struct.unpack("<fff", reader.read(12))
-
-            self.cent = [read_float(reader) for i in range(3)]
-            self.radius = read_float(reader)
-            self.box1 = [read_float(reader) for i in range(3)]
-            self.box2 = [read_float(reader) for i in range(3)]
-            self.unknowns1 = [read_float(reader) for i in range(3)]
-            self.height = read_float(reader)
-            self.unknown1 = read_float(reader)
-            self.unknown_int = read_int32(reader)
-            self.bbox_volume = read_float(reader)
-            self.materialRefsCount = read_int32(reader)
-            self.u2 = read_int32(reader)
-            self.lod_level = read_int32(reader)
-            self.name = reader.read(64).decode().replace("\0", "")
-            self.unknowns3 = [read_int32(reader) for i in range(2)]
-            self.materialRefs: List[MaterialRef] = []
-
+            self.read(reader)
             return
         else:
             self.facesCount = 0
@@ -403,49 +693,83 @@ class MeshDescription:
             self.unknowns3 = [0 for i in range(2)]
             self.materialRefs: List[MaterialRef] = []
 
-    def write(self, writer: BufferedWriter = None):
-        write_int32(writer, self.facesCount)
-        write_int32(writer, self.indiciesOffset)
-        write_int32(writer, self.indiciesSize)
-        write_int32(writer, self.vertexOffset)
-        write_int32(writer, self.vertexSize)
-
-        write_vector(writer, self.zaxis, write_float)
-        write_vector(writer, self.xaxis, write_float)
-        write_vector(writer, self.yaxis, write_float)
-        write_vector(writer, self.position, write_float)
-
-        write_vector(writer, self.cent, write_float)
-        write_float(writer, self.radius)
-        write_vector(writer, self.box1, write_float)
-        write_vector(writer, self.box2, write_float)
-        write_vector(writer, self.unknowns1, write_float)
-        write_float(writer, self.height)
-        write_float(writer, self.unknown1)
-        write_int32(writer, self.unknown_int)
-        write_float(writer, self.bbox_volume)
-        write_int32(writer, self.materialRefsCount)
-        write_int32(writer, self.u2)
-        write_int32(writer, self.lod_level)
-        write_str(writer, self.name, 64)
-        write_vector(writer, self.unknowns3, write_int32)
-
-
-class MaterialRef:
+    def assign(self, values: Tuple):
+        self.facesCount = values[0]
+        self.indiciesOffset = values[1]
+        self.indiciesSize = values[2]
+        self.vertexOffset = values[3]
+        self.vertexSize = values[4]
+
+        self.zaxis = values[5:8]
+        self.xaxis = values[8:11]
+        self.yaxis = values[11:14]
+        self.position = values[14:17]
+
+        self.cent = list(values[17:20])
+        self.radius = values[20]
+        self.box1 = list(values[21:24])
+        self.box2 = list(values[24:27])
+        self.unknowns1 = list(values[27:30])
+        self.height = values[30]
+        self.unknown1 = values[31]
+        self.unknown_int = values[32]
+        self.bbox_volume = values[33]
+        self.materialRefsCount = values[34]
+        self.u2 = values[35]
+        self.lod_level = values[36]
+        self.name = unpack_str(values[37])
+        self.unknowns3 = list(values[38:40])
+        self.materialRefs: List[MaterialRef] = []
+
+    def values(self) -> Tuple:
+        return (
+            self.facesCount,
+            self.indiciesOffset,
+            self.indiciesSize,
+            self.vertexOffset,
+            self.vertexSize,
+            *self.zaxis,
+            *self.xaxis,
+            *self.yaxis,
+            *self.position,
+            *self.cent,
+            self.radius,
+            *self.box1,
+            *self.box2,
+            *self.unknowns1,
+            self.height,
+            self.unknown1,
+            self.unknown_int,
+            self.bbox_volume,
+            self.materialRefsCount,
+            self.u2,
+            self.lod_level,
+            pack_str(self.name),
+            *self.unknowns3,
+        )
+
+
+class MaterialRef(Record):
     """
     '  Size    :   0x20
     """
 
+    __slots__ = (
+        "materialDefinition",
+        "indiciesOffset",
+        "indiciesSize",
+        "vertexOffset",
+        "vertexSize",
+        "facesOffset",
+        "facesSize",
+        "unknown",
+    )
+
+    codec = struct.Struct("<7If")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.materialDefinition = read_int32(reader)
-            self.indiciesOffset = read_int32(reader)
-            self.indiciesSize = read_int32(reader)
-            self.vertexOffset = read_int32(reader)
-            self.vertexSize = read_int32(reader)
-            self.facesOffset = read_int32(reader)
-            self.facesSize = read_int32(reader)
-            self.unknown = read_float(reader)
+            self.read(reader)
             return
         else:
             self.materialDefinition = 0
@@ -457,82 +781,73 @@ class MaterialRef:
             self.facesSize = 0
             self.unknown = 0.0
 
-    def write(self, writer: BufferedWriter = None):
-        write_int32(writer, self.materialDefinition)
-        write_int32(writer, self.indiciesOffset)
-        write_int32(writer, self.indiciesSize)
-        write_int32(writer, self.vertexOffset)
-        write_int32(writer, self.vertexSize)
-        write_int32(writer, self.facesOffset)
-        write_int32(writer, self.facesSize)
-        write_float(writer, self.unknown)
-
-
-class Bone:
+    def assign(self, values: Tuple):
+        (
+            self.materialDefinition,
+            self.indiciesOffset,
+            self.indiciesSize,
+            self.vertexOffset,
+            self.vertexSize,
+            self.facesOffset,
+            self.facesSize,
+            self.unknown,
+        ) = values
+
+    def values(self) -> Tuple:
+        return (
+            self.materialDefinition,
+            self.indiciesOffset,
+            self.indiciesSize,
+            self.vertexOffset,
+            self.vertexSize,
+            self.facesOffset,
+            self.facesSize,
+            self.unknown,
+        )
+
+
+class Bone(Record):
     """
     '  Size    :   0x30
     """
 
+    __slots__ = ("zaxis", "xaxis", "yaxis", "position", "name")
+
+    codec = struct.Struct("<12f")
+
     def __init__(self, reader: BufferedReader = None, count: int = 0):
+        self.name = str(count)
         if reader:
-            self.zaxis = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.xaxis = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.yaxis = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.position = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.name = str(count)
+            self.read(reader)
             return
+        else:
+            self.zaxis = (0.0, 0.0, 0.0)
+            self.xaxis = (0.0, 0.0, 0.0)
+            self.yaxis = (0.0, 0.0, 0.0)
+            self.position = (0.0, 0.0, 0.0)
 
-    def write(self, writer: BufferedWriter = None):
-        write_vector(writer, self.zaxis, write_float)
-        write_vector(writer, self.xaxis, write_float)
-        write_vector(writer, self.yaxis, write_float)
-        write_vector(writer, self.position, write_float)
+    def assign(self, values: Tuple):
+        self.zaxis = values[0:3]
+        self.xaxis = values[3:6]
+        self.yaxis = values[6:9]
+        self.position = values[9:12]
+
+    def values(self) -> Tuple:
+        return (*self.zaxis, *self.xaxis, *self.yaxis, *self.position)
 
 
-class Entity:
+class Entity(Record):
     """
     '  Size    :   0x130
     """
 
+    __slots__ = ("zaxis", "xaxis", "yaxis", "position", "name")
+
+    codec = struct.Struct("<12f256s")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.zaxis = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.xaxis = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.yaxis = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.position = (
-                read_float(reader),
-                read_float(reader),
-                read_float(reader),
-            )
-            self.name = reader.read(256).decode().replace("\0", "")
+            self.read(reader)
             return
         else:
             self.zaxis = (0.0, 0.0, 0.0)
@@ -541,65 +856,88 @@ class Entity:
             self.position = (0.0, 0.0, 0.0)
             self.name = ""
 
-    def write(self, writer: BufferedWriter = None):
-        write_vector(writer, self.zaxis, write_float)
-        write_vector(writer, self.xaxis, write_float)
-        write_vector(writer, self.yaxis, write_float)
-        write_vector(writer, self.position, write_float)
-        write_str(writer, self.name, 256)
+    def assign(self, values: Tuple):
+        self.zaxis = values[0:3]
+        self.xaxis = values[3:6]
+        self.yaxis = values[6:9]
+        self.position = values[9:12]
+        self.name = unpack_str(values[12])
 
+    def values(self) -> Tuple:
+        return (
+            *self.zaxis,
+            *self.xaxis,
+            *self.yaxis,
+            *self.position,
+            pack_str(self.name),
+        )
 
-class Unknown1:
+
+class Unknown1(Record):
     """
     '  Size    :   0x0C
     """
 
+    __slots__ = ("position",)
+
+    codec = struct.Struct("<3f")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.position = struct.unpack("<fff", reader.read(12))
+            self.read(reader)
             return
         else:
             self.position = (0.0, 0.0, 0.0)
 
-    def write(self, writer: BufferedWriter = None):
-        write_vector(writer, self.position, write_float)
+    def assign(self, values: Tuple):
+        self.position = values
+
+    def values(self) -> Tuple:
+        return tuple(self.position)
 
 
-class CollisionPoint:
+class CollisionPoint(Record):
     """
     '  Size    :   0x0C
     """
 
+    __slots__ = ("position",)
+
+    codec = struct.Struct("<3f")
+
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.position = struct.unpack("<fff", reader.read(12))
+            self.read(reader)
             return
         else:
             self.position = (0.0, 0.0, 0.0)
 
-    def write(self, writer: BufferedWriter = None):
-        write_vector(writer, self.position, write_float)
+    def assign(self, values: Tuple):
+        self.position = values
+
+    def values(self) -> Tuple:
+        return tuple(self.position)
 
 
-class Stride:
+class Stride(Record):
     """
     '  Size    :   0x88
     """
 
+    codec = struct.Struct("<I132s")
     strideFormat = [4, 8, 12, 4, 1]
+    strideDtypes = ["<f4", ("<f4", (2,)), ("<f4", (3,)), "<i4", "u1"]
+    fieldNames = {
+        StrideType.POINT: "position",
+        StrideType.NORMAL: "normal",
+        StrideType.UV_MAP: "uv",
+        StrideType.BONE_INDEX: "bone",
+        StrideType.BONE_WEIGHT: "weight",
+    }
 
     def __init__(self, reader: BufferedReader = None):
         if reader:
-            self.count = read_int32(reader)
-            self.idSizes = [
-                (StrideType(read_int32(reader)), StrideSize(read_int32(reader)))
-                for i in range(self.count)
-            ]
-            self.stride = 0
-            for (_, ssize) in self.idSizes:
-                self.stride = self.stride + Stride.strideFormat[ssize.value]
-            size = 0x88 - 4 - (8 * self.count)
-            self.unknown = reader.read(size)
+            self.read(reader)
             return
         else:
             self.count = 0
@@ -608,52 +946,57 @@ class Stride:
             self.size = 0x88 - 4
             self.unknown = bytes([0 for i in range(self.size)])
 
-    def read_data(self, reader: BufferedReader):
-        data = []
-        for (_, sSize) in self.idSizes:
-            if sSize == StrideSize.INT or sSize == StrideSize.BYTE:
-                data.append(
-                    int.from_bytes(
-                        reader.read(Stride.strideFormat[sSize.value]),
-                        byteorder="little",
-                    )
-                )
-            elif sSize == StrideSize.FLOAT:
-                data.append(read_float(reader))
-            elif sSize == StrideSize.POINT_3D or sSize == StrideSize.TUPLE:
-                vector_size = int(Stride.strideFormat[sSize.value] / 4)
-                data.append([read_float(reader) for i in range(vector_size)])
-            else:
-                raise ValueError("This isn't a supported stride Datatype")
-
-        if len(data) > 1:
-            return data[0]
+    def assign(self, values: Tuple):
+        self.count, raw = values
+        self.idSizes = [
+            (StrideType(sId), StrideSize(sSize))
+            for (sId, sSize) in struct.iter_unpack("<II", raw[: 8 * self.count])
+        ]
+        self.stride = 0
+        for (_, ssize) in self.idSizes:
+            self.stride = self.stride + Stride.strideFormat[ssize.value]
+        self.unknown = raw[8 * self.count :]
+
+    def values(self) -> Tuple:
+        raw = b"".join(
+            struct.pack("<II", sId.value, sSize.value)
+            for (sId, sSize) in self.idSizes
+        )
+        return (self.count, raw + self.unknown)
+
+    def dtype(self) -> np.dtype:
+        """
+        Structured type of one element of the data described by the stride,
+        uv maps are numbered (uv0, uv1...) and so are repeated ids, unknown
+        ids get a raw field typed after their size (unknown_<id>, repeated
+        ones unknown_<id>_1...)
+        """
+        names = []
+        formats = []
+        for i, (sId, sSize) in enumerate(self.idSizes):
+            name = Stride.fieldNames.get(sId, sId.name.lower())
+            count = sum(1 for (pId, _) in self.idSizes[:i] if pId == sId)
+            if sId == StrideType.UV_MAP or count:
+                # unknown_11 then 1 isn't unknown_111, the name of id 111
+                separator = "_" if name[-1].isdigit() else ""
+                name = f"{name}{separator}{count}"
+            names.append(name)
+            formats.append(Stride.strideDtypes[sSize.value])
+
+        return np.dtype({"names": names, "formats": formats})
+
+    def interleave(self, columns: List[np.ndarray], count: int) -> np.ndarray:
+        """
+        Structured array of count elements out of one column per field,
+        in the order of idSizes
+        """
+        data = np.empty(count, dtype=self.dtype())
+        for name, column in zip(data.dtype.names, columns):
+            data[name] = column
         return data
 
-    def write(self, writer: BufferedWriter):
-        write_int32(writer, self.count)
-        for sId, sSize in self.idSizes:
-            write_int32(writer, sId.value)
-            write_int32(writer, sSize.value)
-        writer.write(self.unknown)
-
-    def write_data(self, writer: BufferedWriter, data: List[List]):
-        for stride_data in data:
-            for i, (_, sSize) in enumerate(self.idSizes):
-                if sSize == StrideSize.BYTE:
-                    writer.write(
-                        stride_data[i].to_bytes(
-                            1, byteorder="little", signed=False
-                        )
-                    )
-                elif sSize == StrideSize.INT:
-                    write_int32(writer, stride_data[i])
-                elif sSize == StrideSize.FLOAT:
-                    write_float(writer, stride_data[i])
-                elif sSize == StrideSize.POINT_3D or sSize == StrideSize.TUPLE:
-                    write_vector(writer, stride_data[i], write_int32)
-                else:
-                    raise ValueError("Not a supported stride Datatype")
+    def write_data(self, writer: BufferedWriter, data: np.ndarray):
+        writer.write(np.ascontiguousarray(data, dtype=self.dtype()))
 
 
 class Vertex:
@@ -661,101 +1004,55 @@ class Vertex:
     '  Size    :   0x20
     """
 
+    __slots__ = ("position", "normal", "uvs")
+
     def __init__(self, stride: Stride, reader: BufferedReader = None):
+        self.uvs = []
+        self.position = (0.0, 0.0, 0.0)
+        self.normal = (0.0, 0.0, 0.0)
         if reader:
-            self.uvs = []
-            for (strideId, _) in stride.idSizes:
-                if strideId == StrideType.POINT:
-                    self.position = (
-                        read_float(reader),
-                        read_float(reader),
-                        read_float(reader),
-                    )
-                elif strideId == StrideType.NORMAL:
-                    self.normal = (
-                        read_float(reader),
-                        read_float(reader),
-                        read_float(reader),
-                    )
-                elif strideId == StrideType.UV_MAP:
-                    self.uvs.append((read_float(reader), read_float(reader)))
-                else:
-                    raise ValueError(
-                        f"This type is not usable for a Vertex {strideId.name}"
-                    )
-            return
-        else:
-            self.uvs = []
-            self.position = (0.0, 0.0, 0.0)
-            self.normal = (0.0, 0.0, 0.0)
+            record = read_array(reader, stride.dtype(), 1)
+            self.assign(stride, [record[name][0] for name in record.dtype.names])
+
+    @classmethod
+    def from_values(cls, stride: Stride, values: Iterable) -> "Vertex":
+        """Build a vertex from the values of its stride fields"""
+        vertex = cls(stride)
+        vertex.assign(stride, values)
+        return vertex
+
+    def assign(self, stride: Stride, values: Iterable):
+        for (strideId, _), value in zip(stride.idSizes, values):
+            if strideId == StrideType.POINT:
+                self.position = tuple(value)
+            elif strideId == StrideType.NORMAL:
+                self.normal = tuple(value)
+            elif strideId == StrideType.UV_MAP:
+                self.uvs.append(tuple(value))
+            else:
+                raise ValueError(
+                    f"This type is not usable for a Vertex {strideId.name}"
+                )
+
+    def values(self, stride: Stride) -> Tuple:
+        """Values of the vertex in the order of its stride fields"""
+        uvs = iter(self.uvs)
+        values = []
+        for (strideId, _) in stride.idSizes:
+            if strideId == StrideType.POINT:
+                values.append(self.position)
+            elif strideId == StrideType.NORMAL:
+                values.append(self.normal)
+            elif strideId == StrideType.UV_MAP:
+                values.append(next(uvs))
+            else:
+                raise ValueError(
+                    f"This type is not usable for a Vertex {strideId.name}"
+                )
+        return tuple(values)
 
     def write(self, writer: BufferedWriter):
         write_vector(writer, self.position, write_float)
         write_vector(writer, self.normal, write_float)
         for uv in self.uvs:
             write_vector(writer, uv, write_float)
-
-
-def main():
-    localPath = os.path.dirname(os.path.abspath(__file__))
-    with open(os.path.join(localPath, "deftests_config.json")) as cfgFile:
-        config = json.load(cfgFile)
-    resultPath = os.path.join(localPath, "WriteBWM")
-
-    def clean_up():
-        for filePath in glob(f"{resultPath}\\**"):
-            os.remove(filePath)
-        os.rmdir(resultPath)
-
-    if os.path.exists(resultPath):
-        clean_up()
-    try:
-        os.mkdir(resultPath)
-        allSame = True
-
-        for filePath in glob(f"{config['gamePath']}\\{config['bwmsPath']}"):
-            with open(filePath, "rb") as testBWM:
-                fileName = os.path.basename(filePath)
-                try:
-                    file = BWMFile(testBWM)
-                except ValueError:
-                    print(
-                        f"{Fore.RED}Couldn't read{Style.RESET_ALL}"
-                        f" {fileName}"
-                    )
-                    continue
-
-                resultFile = os.path.join(resultPath, fileName)
-                file.write(resultFile)
-                if not filecmp.cmp(filePath, resultFile):
-                    print(
-                        f"{Fore.YELLOW}Writing"
-                        f"{Style.RESET_ALL} {fileName} {Fore.YELLOW}"
-                        f"back don't yield an exact copy{Style.RESET_ALL}"
-                    )
-                    allSame = False
-                os.remove(resultFile)
-
-        if allSame:
-            print(
-                f"{Fore.GREEN}All files written are exact copies of their"
-                f" original{Style.RESET_ALL}"
-            )
-        else:
-            print(
-                f"{Fore.RED}Some written files aren't exact copie of their"
-                f" original{Style.RESET_ALL}"
-            )
-
-        os.rmdir(resultPath)
-    except (KeyboardInterrupt, FileExistsError) as e:
-        clean_up()
-        print(e)
-
-    return
-
-
-if __name__ == "__main__":
-
-    # test call
-    main()
@@ -1,8 +1,10 @@
 # coding=utf-8
 """Module containing function generally usefull to parsing binary files"""
 from io import BufferedReader, BufferedWriter
-from typing import Iterable
+from typing import Iterable, List, Tuple
+import mmap
 import struct
+import numpy as np
 
 
 def read_bool(reader: BufferedReader) -> bool:
@@ -29,10 +31,33 @@ def read_vector(reader: BufferedReader, size: int, type_fun) -> Iterable:
     return [type_fun(reader) for _ in range(size)]
 
 
+def read_array(reader: BufferedReader, dtype: np.dtype, count: int) -> np.ndarray:
+    """Return the next count elements of dtype in a file as a read-only array"""
+    dtype = np.dtype(dtype)
+    return np.frombuffer(
+        reader.read(dtype.itemsize * count), dtype=dtype, count=count
+    )
+
+
+def map_reader(reader: BufferedReader) -> mmap.mmap:
+    """Return a read-only memory mapping of the whole file behind a reader"""
+    return mmap.mmap(reader.fileno(), 0, access=mmap.ACCESS_READ)
+
+
 def read_str(reader: BufferedReader, size: int) -> str:
     return reader.read(size).decode("utf-8").replace("\0", "")
 
 
+def unpack_str(value: bytes) -> str:
+    """Return a string out of a fixed size null padded field"""
+    return value.decode("utf-8").replace("\0", "")
+
+
+def pack_str(string: str) -> bytes:
+    """Return a string as bytes to be null padded by a fixed size field"""
+    return string.encode("utf-8")
+
+
 def write_bool(writer: BufferedWriter, bool: bool) -> None:
     """Return the nex byte in a file in a boolean"""
     writer.write(bool.to_bytes(1, byteorder="little", signed=False))
@@ -57,5 +82,49 @@ def write_vector(writer: BufferedWriter, vector: Iterable, type_fun) -> None:
 
 
 def write_str(writer: BufferedWriter, string: str, size: int) -> None:
-    writer.write(string.encode("utf-8"))
-    writer.write(bytes([0 for _ in range(size - len(string))]))
+    writer.write(string.encode("utf-8").ljust(size, b"\0"))
+
+
+class Record:
+    """
+    Base of the structures with a fixed size layout, each one is decoded
+    and encoded in one go by the precompiled codec of its class
+    """
+
+    __slots__ = ()
+    codec: struct.Struct
+
+    @classmethod
+    def from_values(cls, values: Tuple) -> "Record":
+        """Build a record from the values unpacked by its codec"""
+        record = cls.__new__(cls)
+        record.assign(values)
+        return record
+
+    @classmethod
+    def read_records(cls, reader: BufferedReader, count: int) -> List:
+        """Return the next count records in a file with a single read"""
+        if not reader:
+            return [cls() for _ in range(count)]
+        return [
+            cls.from_values(values)
+            for values in cls.codec.iter_unpack(
+                reader.read(cls.codec.size * count)
+            )
+        ]
+
+    def read(self, reader: BufferedReader) -> None:
+        """Decode the record from the next bytes of a file"""
+        self.assign(self.codec.unpack(reader.read(self.codec.size)))
+
+    def assign(self, values: Tuple) -> None:
+        raise NotImplementedError
+
+    def values(self) -> Tuple:
+        raise NotImplementedError
+
+    def write(self, writer: BufferedWriter) -> None:
+        writer.write(self.codec.pack(*self.values()))
+
+    def pack_into(self, buffer: bytearray, offset: int) -> None:
+        self.codec.pack_into(buffer, offset, *self.values())
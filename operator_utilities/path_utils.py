@@ -0,0 +1,16 @@
+# coding=utf-8
+"""
+Store utility functions to find the .bwm files of a directory.
+"""
+from typing import List
+import os
+
+
+def find_bwm_files(directory: str) -> List[str]:
+    """Every .bwm file under directory, sorted"""
+    paths = []
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if name.lower().endswith(".bwm"):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
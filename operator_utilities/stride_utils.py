@@ -0,0 +1,54 @@
+# coding=utf-8
+"""
+Store utility functions to create the strides of the vertex block and of the
+Bone/Weight table of skins.
+"""
+from typing import List
+
+from .file_definition_bwm import StrideType, StrideSize, Stride
+
+
+def vertex_stride(normal: bool, uv_count: int) -> Stride:
+    """
+    Create the Stride of vertices with a position, optionally a normal and
+    uv_count uv maps
+    """
+    stride = Stride()
+
+    stride.idSizes.append((StrideType.POINT, StrideSize.POINT_3D))
+    stride.stride = 12
+    if normal:
+        stride.idSizes.append((StrideType.NORMAL, StrideSize.POINT_3D))
+        stride.stride += 12
+    for _ in range(uv_count):
+        stride.idSizes.append((StrideType.UV_MAP, StrideSize.TUPLE))
+        stride.stride += 8
+
+    stride.count = len(stride.idSizes)
+    stride.size = 0x88 - 4 - (8 * stride.count)
+    stride.unknown = bytes([0 for i in range(stride.size)])
+
+    return stride
+
+
+def create_skin_strides() -> List[Stride]:
+    """
+    Create the strides deffining a Bone/Weight table of a Skin
+    """
+    strides = [Stride() for i in range(8)]
+
+    for stride in strides[:4]:
+        stride.count = 1
+        stride.idSizes.append((StrideType.BONE_INDEX, StrideSize.BYTE))
+        stride.stride = 1
+        stride.size = 0x7C
+        stride.unknown = bytes([0 for i in range(stride.size)])
+
+    for stride in strides[4:]:
+        stride.count = 1
+        stride.idSizes.append((StrideType.BONE_WEIGHT, StrideSize.FLOAT))
+        stride.stride = 4
+        stride.size = 0x7C
+        stride.unknown = bytes([0 for i in range(stride.size)])
+
+    return strides
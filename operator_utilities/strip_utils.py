@@ -0,0 +1,36 @@
+# coding=utf-8
+"""
+Store utility functions to decode the triangle strips of skins into lists of
+triangles.
+"""
+from typing import Tuple, Union
+import numpy as np
+
+
+def strip_to_triangles(
+    strip: np.ndarray, return_index: bool = False
+) -> Union[np.ndarray, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Triangles (Nx3 int32) of a triangle strip, every odd triangle has its
+    first two indexes swapped to keep the winding and degenerate triangles
+    (used to join strips) are dropped. With return_index, also return the
+    index in the strip of each triangle kept, to map per strip triangle data
+    such as materials.
+    """
+    strip = np.asarray(strip, dtype=np.int32)
+    count = max(len(strip) - 2, 0)
+    triangles = np.column_stack(
+        [strip[:count], strip[1 : count + 1], strip[2 : count + 2]]
+    )
+    triangles[1::2, [0, 1]] = triangles[1::2, [1, 0]]
+
+    kept = np.flatnonzero(
+        (triangles[:, 0] != triangles[:, 1])
+        & (triangles[:, 1] != triangles[:, 2])
+        & (triangles[:, 2] != triangles[:, 0])
+    )
+    triangles = triangles[kept]
+
+    if return_index:
+        return triangles, kept
+    return triangles
@@ -3,7 +3,7 @@
 Store utility functions to change the coordinate system of vectors and matrixes
 (for uv an geometry), build transformation matrix from BWM entities.
 """
-from typing import Tuple, Union, Callable
+from typing import Callable, Sequence, Tuple, Union
 import numpy as np
 from ..operator_utilities.file_definition_bwm import (
     Bone,
@@ -12,6 +12,11 @@ from ..operator_utilities.file_definition_bwm import (
 )
 
 
+# Index of the source axis of each destination axis
+ZXY_TO_XYZ = [2, 0, 1]  # Z -> X, X -> Y, Y -> Z
+XYZ_TO_ZXY = [1, 2, 0]  # X -> Z, Y -> X, Z -> Y
+
+
 def zxy_to_xyz(matrix_or_vector: np.ndarray) -> np.ndarray:
     """
     Rotate a vector or a rotation matrix defined in zxy
@@ -20,14 +25,7 @@ def zxy_to_xyz(matrix_or_vector: np.ndarray) -> np.ndarray:
     if len(matrix_or_vector) != 3:
         raise ValueError("Must be a vector of size 3 or a 3x3 matrix")
 
-    return np.matmul(
-        [
-            [0.0, 0.0, 1.0],  # Z -> X
-            [1.0, 0.0, 0.0],  # X -> Y
-            [0.0, 1.0, 0.0],  # Y -> Z
-        ],
-        matrix_or_vector,
-    )
+    return np.asarray(matrix_or_vector, dtype=float)[ZXY_TO_XYZ]
 
 
 def xyz_to_zxy(matrix_or_vector: np.ndarray) -> np.ndarray:
@@ -38,14 +36,39 @@ def xyz_to_zxy(matrix_or_vector: np.ndarray) -> np.ndarray:
     if len(matrix_or_vector) != 3:
         raise ValueError("Must be a vector of size 3 or a 3x3 matrix")
 
-    return np.matmul(
-        [
-            [0.0, 1.0, 0.0],  # X -> Z
-            [0.0, 0.0, 1.0],  # Y -> X
-            [1.0, 0.0, 0.0],  # Z -> Y
-        ],
-        matrix_or_vector,
-    )
+    return np.asarray(matrix_or_vector, dtype=float)[XYZ_TO_ZXY]
+
+
+def zxy_to_xyz_vectors(vectors: np.ndarray) -> np.ndarray:
+    """
+    Rotate an array of vectors (..., 3) defined in zxy coordinate to xyz
+    ones, keeping their type.
+    """
+    return np.asarray(vectors)[..., ZXY_TO_XYZ]
+
+
+def xyz_to_zxy_vectors(vectors: np.ndarray) -> np.ndarray:
+    """
+    Rotate an array of vectors (..., 3) defined in xyz coordinate to zxy
+    ones, keeping their type.
+    """
+    return np.asarray(vectors)[..., XYZ_TO_ZXY]
+
+
+def zxy_to_xyz_matrices(matrices: np.ndarray) -> np.ndarray:
+    """
+    Rotate an array of rotation matrices (..., 3, 3) defined in zxy
+    coordinate to xyz ones.
+    """
+    return np.asarray(matrices)[..., ZXY_TO_XYZ, :]
+
+
+def xyz_to_zxy_matrices(matrices: np.ndarray) -> np.ndarray:
+    """
+    Rotate an array of rotation matrices (..., 3, 3) defined in xyz
+    coordinate to zxy ones.
+    """
+    return np.asarray(matrices)[..., XYZ_TO_ZXY, :]
 
 
 def construct_transformation_matrix(
@@ -69,9 +92,43 @@ def construct_transformation_matrix(
     ]
 
 
+def construct_transformation_matrices(
+    bwm_entities: Sequence[Union[Bone, Entity, MeshDescription]],
+    coordinate_rotation: Callable[[np.ndarray], np.ndarray],
+) -> np.ndarray:
+    """
+    Array (N, 4, 4) of the transformation matrices of many BWM entities,
+    laid out as construct_transformation_matrix. coordinate_rotation works
+    on rotation matrices (zxy_to_xyz_matrices or xyz_to_zxy_matrices).
+    """
+    count = len(bwm_entities)
+    axes = np.array(
+        [(e.zaxis, e.xaxis, e.yaxis) for e in bwm_entities], dtype=float
+    ).reshape(count, 3, 3)
+    positions = np.array(
+        [e.position for e in bwm_entities], dtype=float
+    ).reshape(count, 3, 1)
+
+    matrices = np.zeros((count, 4, 4))
+    matrices[:, :3, :3] = coordinate_rotation(axes).transpose(0, 2, 1)
+    # A column vector is rotated like a matrix
+    matrices[:, 3, :3] = coordinate_rotation(positions)[:, :, 0]
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
 def correct_uv(vector: Tuple[float, float]) -> Tuple[float, float]:
     """
     Switch from Black & White uv coordinate to Blender uv coordinates
     and vice-versa
     """
     return (vector[0], 1.0 - vector[1])
+
+
+def correct_uvs(uvs: np.ndarray) -> np.ndarray:
+    """
+    Array version of correct_uv, for uvs of shape (..., 2)
+    """
+    corrected = np.array(uvs, dtype=np.float32)
+    corrected[..., 1] = 1.0 - corrected[..., 1]
+    return corrected